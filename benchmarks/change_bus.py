@@ -0,0 +1,94 @@
+"""Measure cross-worker delivery latency of the SQLite change-log bus.
+
+Usage: python -m benchmarks.change_bus [--workers 4] [--messages 200] [--rate 200] [--max-p99-ms 250]
+
+Starts ``--workers`` separate processes sharing one change log. Each one
+publishes ``--messages`` messages at ``--rate`` per second while recording
+how long every other worker's messages took to reach its handler. Exits
+non-zero if a message is lost or the p99 latency exceeds ``--max-p99-ms``.
+tests/test_change_bus.py runs a smaller version under pytest.
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from benchmarks.common import summarize, use_temp_database
+
+use_temp_database()
+
+from server.bus import SQLiteChangeLogBus  # noqa: E402
+
+
+def _worker(path: str, index: int, workers: int, messages: int, rate: float, poll: float, barrier, results):
+    bus = SQLiteChangeLogBus(Path(path), poll_interval=poll)
+    expected = (workers - 1) * messages
+    latencies = []
+    done = threading.Event()
+
+    def on_message(payload):
+        if payload["worker"] == index:
+            return  # publish() also runs handlers in the sending process
+        latencies.append(time.time() - payload["sent"])
+        if len(latencies) >= expected:
+            done.set()
+
+    bus.subscribe("bench", on_message)
+    bus.start()
+    barrier.wait()  # every worker is tailing the log before anyone publishes
+    for sequence in range(messages):
+        bus.publish("bench", {"worker": index, "sequence": sequence, "sent": time.time()})
+        time.sleep(1 / rate)
+    done.wait(timeout=30)
+    bus.close()
+    results.put((index, latencies))
+
+
+def run(workers: int, messages: int, rate: float, poll: float) -> Tuple[List[float], int]:
+    """Run the workers against a fresh change log; returns every delivery latency and how many were expected."""
+    path = Path(tempfile.mkdtemp(prefix="quaddash-bus-")) / "change_log.db"
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    barrier = context.Barrier(workers)
+    processes = [
+        context.Process(target=_worker, args=(str(path), index, workers, messages, rate, poll, barrier, results))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = [latency for _, worker_latencies in collected for latency in worker_latencies]
+    return latencies, workers * (workers - 1) * messages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=200, help="messages published per worker")
+    parser.add_argument("--rate", type=float, default=200, help="messages per second per worker")
+    parser.add_argument("--poll", type=float, default=0.05, help="bus poll interval in seconds")
+    parser.add_argument("--max-p99-ms", type=float, default=250)
+    args = parser.parse_args()
+
+    latencies, expected = run(args.workers, args.messages, args.rate, args.poll)
+    stats = summarize(latencies) if latencies else {}
+    print(f"workers={args.workers} poll={args.poll}s delivered={len(latencies)}/{expected} {stats}")
+
+    if len(latencies) != expected:
+        print("FAIL: messages were lost")
+        return 1
+    if stats["p99_ms"] > args.max_p99_ms:
+        print(f"FAIL: p99 {stats['p99_ms']}ms exceeds {args.max_p99_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
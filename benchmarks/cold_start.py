@@ -0,0 +1,77 @@
+"""Break a cold start down into import, schema, lifespan and first-request time.
+
+Usage: python -m benchmarks.cold_start [--runs 5] [--schema-bootstrap auto|always|skip]
+
+Every run is a fresh interpreter that imports ``server.main``, runs the app
+lifespan and serves one request in-process, then prints ``/stats/startup``.
+The first run creates the schema in a throwaway database; the rest start
+against the existing one, which is the case ``schema_bootstrap=auto`` speeds
+up. Reports the first run and the median of the others, in milliseconds,
+plus the total process time seen from outside.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import use_temp_database
+
+
+async def _child() -> None:
+    import httpx
+
+    from server.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await client.get("/auth/universities")
+            report = (await client.get("/stats/startup")).json()
+    print(json.dumps(report))
+
+
+def _run_once(env) -> dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    report["process"] = round((time.perf_counter() - started) * 1000, 3)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--schema-bootstrap", choices=["auto", "always", "skip"], default="auto")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import asyncio
+
+        asyncio.run(_child())
+        return
+
+    use_temp_database()
+    env = dict(os.environ, APP_SCHEMA_BOOTSTRAP=args.schema_bootstrap)
+    # The first run always has to create the schema
+    reports = [_run_once(dict(env, APP_SCHEMA_BOOTSTRAP="auto"))]
+    reports += [_run_once(env) for _ in range(args.runs - 1)]
+
+    phases = list(reports[0])
+    print(f"{'phase':<20} {'first run':>10} {'median':>10}")
+    for phase in phases:
+        rest = [report[phase] for report in reports[1:] if phase in report]
+        median = f"{statistics.median(rest):>10.1f}" if rest else f"{'-':>10}"
+        print(f"{phase:<20} {reports[0][phase]:>10.1f} {median}")
+
+
+if __name__ == "__main__":
+    main()
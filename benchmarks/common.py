@@ -0,0 +1,28 @@
+import os
+import tempfile
+from typing import Dict, List, Sequence
+
+
+def use_temp_database() -> str:
+    """Point the app at a throwaway SQLite file unless APP_DATABASE_URL is already set.
+
+    Must run before anything from ``server`` is imported, since settings are read at import.
+    """
+    path = tempfile.mkdtemp(prefix="quaddash-bench-")
+    return os.environ.setdefault("APP_DATABASE_URL", f"sqlite:///{path}/bench.db")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
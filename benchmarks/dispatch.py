@@ -0,0 +1,144 @@
+"""Time batch dispatch against batch size.
+
+Usage: python -m benchmarks.dispatch [--sizes 100,500,1000,2000] [--driver-ratio 0.5]
+
+For each batch size, seeds a throwaway database with that many pending rides
+around one campus plus available drivers, then times the in-memory planning
+step (``plan_assignments``) and a full ``run_dispatch`` that reads the batch,
+applies every assignment in one transaction and publishes the changes.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import delete  # noqa: E402
+
+from server import dispatch  # noqa: E402
+from server.config import settings  # noqa: E402
+from server.database import SessionLocal, async_engine, engine  # noqa: E402
+from server.migrations import upgrade_schema  # noqa: E402
+from server.models import DriverAvailability, RideRequest, User, UserRole  # noqa: E402
+
+UNIVERSITY = "howard"
+CAMPUS = (38.9227, -77.0194)
+SPREAD_DEGREES = 0.03
+
+
+def _random_point(rng: random.Random):
+    return (CAMPUS[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES), CAMPUS[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES))
+
+
+def _seed(rng: random.Random, batch: int, drivers: int, run: int):
+    """Insert ``batch`` riders with pending rides and ``drivers`` available drivers."""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    riders = [
+        User(
+            email=f"bench-{run}-rider-{i}@howard.edu",
+            hashed_password="x",
+            full_name=f"Bench Rider {i}",
+            role=UserRole.rider,
+            university_key=UNIVERSITY,
+            is_verified=True,
+        )
+        for i in range(batch)
+    ]
+    driver_users = [
+        User(
+            email=f"bench-{run}-driver-{i}@howard.edu",
+            hashed_password="x",
+            full_name=f"Bench Driver {i}",
+            role=UserRole.driver,
+            university_key=UNIVERSITY,
+            license_plate=f"BENCH{i}",
+            is_verified=True,
+        )
+        for i in range(drivers)
+    ]
+    db.add_all(riders + driver_users)
+    db.flush()
+
+    rides, available = [], []
+    for rider in riders:
+        pickup = _random_point(rng)
+        ride_date = now + timedelta(minutes=rng.randint(-5, 55))
+        db.add(
+            RideRequest(
+                rider_id=rider.id,
+                university_key=UNIVERSITY,
+                pickup_location="Bench pickup",
+                destination="Bench destination",
+                ride_date=ride_date,
+                pickup_lat=pickup[0],
+                pickup_lng=pickup[1],
+            )
+        )
+        rides.append((rider.id, ride_date, pickup))
+    for driver in driver_users:
+        position = _random_point(rng)
+        since = now - timedelta(seconds=rng.randint(0, 3600))
+        db.add(
+            DriverAvailability(
+                driver_id=driver.id,
+                university_key=UNIVERSITY,
+                lat=position[0],
+                lng=position[1],
+                available_since=since,
+            )
+        )
+        available.append((driver.id, since, position))
+    db.commit()
+    db.close()
+    return rides, available
+
+
+def _clear() -> None:
+    with engine.begin() as conn:
+        conn.execute(delete(DriverAvailability))
+        conn.execute(delete(RideRequest))
+
+
+async def _dispatch_once():
+    start = time.perf_counter()
+    dispatched = await dispatch.run_dispatch(UNIVERSITY)
+    elapsed = time.perf_counter() - start
+    # Pooled connections belong to this event loop; the next size runs on a new one
+    await async_engine.dispose()
+    return elapsed, len(dispatched)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,500,1000,2000")
+    parser.add_argument("--driver-ratio", type=float, default=0.5, help="Available drivers per pending ride")
+    parser.add_argument("--repeat", type=int, default=5, help="Planning runs per size (best is reported)")
+    args = parser.parse_args()
+
+    upgrade_schema(engine)
+    settings.dispatch_batch_size = max(int(size) for size in args.sizes.split(","))
+    rng = random.Random(42)
+
+    print(f"{'batch':>8}{'drivers':>9}{'assigned':>10}{'plan ms':>10}{'dispatch ms':>13}")
+    for run, size in enumerate(int(size) for size in args.sizes.split(",")):
+        drivers = max(1, int(size * args.driver_ratio))
+        rides, available = _seed(rng, size, drivers, run)
+
+        plan_seconds = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            dispatch.plan_assignments(rides, available)
+            plan_seconds = min(plan_seconds, time.perf_counter() - start)
+
+        dispatch_seconds, assigned = asyncio.run(_dispatch_once())
+        print(f"{size:>8}{drivers:>9}{assigned:>10}{plan_seconds * 1000:>10.2f}{dispatch_seconds * 1000:>13.2f}")
+        _clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Scripted rider/driver load test reporting per-endpoint latency percentiles.
+
+Usage:
+    python -m benchmarks.loadtest [--riders 20] [--drivers 5] [--seconds 30] [--output results.json]
+    python -m benchmarks.loadtest --base-url http://localhost:8000
+
+Without --base-url the ``server.main:app`` ASGI app runs in-process against a
+throwaway SQLite database. Riders register, log in, request a ride, poll
+until it is done and review it; drivers poll the pending queue (revalidating
+with ETags like a browser would), accept, and complete rides.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from benchmarks.common import summarize, use_temp_database
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - only needed for this harness
+    sys.exit("The load test needs httpx: pip install httpx")
+
+UNIVERSITY = "howard"
+DOMAIN = "howard.edu"
+
+
+class Recorder:
+    """Collects latency samples keyed by route template."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: "httpx.AsyncClient", method: str, url: str, route: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - start)
+        self.statuses[route][response.status_code] += 1
+        if response.status_code >= 500:
+            self.errors[route] += 1
+        return response
+
+    def report(self, elapsed: float) -> Dict[str, dict]:
+        results = {}
+        for route in sorted(self.latencies):
+            samples = self.latencies[route]
+            results[route] = {
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                "statuses": dict(self.statuses[route]),
+                **summarize(samples),
+            }
+        return results
+
+
+async def _register(client, recorder: Recorder, run_id: str, role: str, index: int) -> Optional[str]:
+    email = f"load-{run_id}-{role}-{index}@{DOMAIN}"
+    payload = {
+        "email": email,
+        "password": "loadtest-password",
+        "full_name": f"Load {role.title()} {index}",
+        "role": role,
+        "university_key": UNIVERSITY,
+    }
+    if role == "driver":
+        payload["license_plate"] = f"LOAD{index}"
+    await recorder.request(client, "POST", "/auth/register", "POST /auth/register", json=payload)
+    response = await recorder.request(
+        client,
+        "POST",
+        "/auth/login",
+        "POST /auth/login",
+        json={"email": email, "password": "loadtest-password"},
+    )
+    if response is None or response.status_code != 200:
+        return None
+    return response.json()["access_token"]
+
+
+async def _rider(client, recorder: Recorder, token: str, deadline: float, poll_interval: float) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        ride_date = (datetime.utcnow() + timedelta(hours=random.randint(1, 48))).isoformat()
+        response = await recorder.request(
+            client,
+            "POST",
+            "/rides/",
+            "POST /rides/",
+            headers=headers,
+            json={"pickup_location": "Library", "destination": "Stadium", "ride_date": ride_date},
+        )
+        if response is None or response.status_code != 201:
+            await asyncio.sleep(poll_interval)
+            continue
+        ride_id = response.json()["id"]
+
+        # Poll until the ride is no longer active (a driver completed it)
+        etag = None
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(poll_interval)
+            poll_headers = dict(headers, **({"If-None-Match": etag} if etag else {}))
+            response = await recorder.request(
+                client, "GET", "/rides/my-request", "GET /rides/my-request", headers=poll_headers
+            )
+            if response is None or response.status_code == 304:
+                continue
+            etag = response.headers.get("etag")
+            if response.status_code == 200 and response.json() is None:
+                await recorder.request(
+                    client,
+                    "POST",
+                    f"/rides/{ride_id}/review",
+                    "POST /rides/{ride_id}/review",
+                    headers=headers,
+                    json={"rating": random.randint(3, 5), "comment": "Smooth ride"},
+                )
+                break
+
+
+async def _driver(client, recorder: Recorder, token: str, deadline: float, poll_interval: float) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    etag = None
+    rides: List[dict] = []
+    while time.perf_counter() < deadline:
+        poll_headers = dict(headers, **({"If-None-Match": etag} if etag else {}))
+        response = await recorder.request(
+            client, "GET", "/rides/pending", "GET /rides/pending", headers=poll_headers, params={"limit": 20}
+        )
+        if response is not None and response.status_code == 200:
+            etag = response.headers.get("etag")
+            rides = response.json()["rides"]
+        if not rides:
+            await asyncio.sleep(poll_interval)
+            continue
+
+        ride = random.choice(rides)
+        response = await recorder.request(
+            client,
+            "POST",
+            f"/rides/{ride['id']}/respond",
+            "POST /rides/{ride_id}/respond",
+            headers=headers,
+            json={"action": "accept"},
+        )
+        if response is None or response.status_code != 200:
+            # Another driver won the race; refresh the queue
+            etag = None
+            continue
+
+        await recorder.request(client, "GET", "/rides/my-accepted", "GET /rides/my-accepted", headers=headers)
+        await asyncio.sleep(poll_interval)
+        await recorder.request(
+            client, "POST", f"/rides/{ride['id']}/complete", "POST /rides/{ride_id}/complete", headers=headers
+        )
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    if args.base_url:
+        return await _run(args, None, args.base_url)
+
+    from server.main import app
+
+    # ASGITransport does not send lifespan events; run startup/shutdown like a server would
+    async with app.router.lifespan_context(app):
+        return await _run(args, httpx.ASGITransport(app=app), "http://loadtest")
+
+
+async def _run(args, transport: Optional["httpx.ASGITransport"], base_url: str) -> dict:
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=args.riders + args.drivers)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=30, limits=limits) as client:
+        rider_tokens = await asyncio.gather(
+            *(_register(client, recorder, run_id, "rider", i) for i in range(args.riders))
+        )
+        driver_tokens = await asyncio.gather(
+            *(_register(client, recorder, run_id, "driver", i) for i in range(args.drivers))
+        )
+
+        started = time.perf_counter()
+        deadline = started + args.seconds
+        await asyncio.gather(
+            *(_rider(client, recorder, t, deadline, args.poll_interval) for t in rider_tokens if t),
+            *(_driver(client, recorder, t, deadline, args.poll_interval) for t in driver_tokens if t),
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "revision": _git_revision(),
+        "target": args.base_url or "in-process",
+        "config": {
+            "riders": args.riders,
+            "drivers": args.drivers,
+            "seconds": args.seconds,
+            "poll_interval": args.poll_interval,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "endpoints": recorder.report(elapsed),
+    }
+
+
+def _print_table(results: dict) -> None:
+    print(f"{'endpoint':<36}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for route, row in results["endpoints"].items():
+        print(
+            f"{route:<36}{row['requests']:>8}{row['errors']:>6}{row['throughput_rps']:>9.1f}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+        )
+    print("(latencies in ms; register/login are measured during setup, outside the timed window)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--riders", type=int, default=20)
+    parser.add_argument("--drivers", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    parser.add_argument("--bcrypt-rounds", type=int, help="Override APP_BCRYPT_ROUNDS for in-process runs")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    if not args.base_url:
+        use_temp_database()
+        # Every simulated user registers from the same address
+        os.environ.setdefault("APP_AUTH_THROTTLE_ENABLED", "false")
+        if args.bcrypt_rounds:
+            os.environ["APP_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+    results = asyncio.run(run(args))
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
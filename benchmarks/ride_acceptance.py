@@ -0,0 +1,143 @@
+"""Fire many drivers at the same pending ride and check exactly one wins.
+
+Usage: python -m benchmarks.ride_acceptance [--drivers 32] [--rides 20]
+
+Runs against a throwaway SQLite database and calls the route handlers
+directly, so it measures the accept path without HTTP overhead.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentile, use_temp_database
+
+use_temp_database()
+
+from fastapi import HTTPException  # noqa: E402
+
+from server import rides, schemas  # noqa: E402
+from server.database import AsyncSessionLocal, SessionLocal, async_engine, engine  # noqa: E402
+from server.migrations import upgrade_schema  # noqa: E402
+from server.models import RideRequest, RideStatus, User, UserRole  # noqa: E402
+
+UNIVERSITY = "howard"
+
+
+def _seed_users(driver_count: int):
+    db = SessionLocal()
+    rider = User(
+        email="bench-rider@howard.edu",
+        hashed_password="x",
+        full_name="Bench Rider",
+        role=UserRole.rider,
+        university_key=UNIVERSITY,
+        is_verified=True,
+    )
+    drivers = [
+        User(
+            email=f"bench-driver-{i}@howard.edu",
+            hashed_password="x",
+            full_name=f"Bench Driver {i}",
+            role=UserRole.driver,
+            university_key=UNIVERSITY,
+            license_plate=f"BENCH{i}",
+            is_verified=True,
+        )
+        for i in range(driver_count)
+    ]
+    db.add_all([rider, *drivers])
+    db.commit()
+    for user in [rider, *drivers]:
+        db.refresh(user)
+        db.expunge(user)
+    db.close()
+    return rider, drivers
+
+
+def _new_ride(rider: User) -> int:
+    db = SessionLocal()
+    ride = RideRequest(
+        rider_id=rider.id,
+        university_key=UNIVERSITY,
+        pickup_location="Library",
+        destination="Stadium",
+        ride_date=datetime.utcnow() + timedelta(hours=1),
+    )
+    db.add(ride)
+    db.commit()
+    ride_id = ride.id
+    db.close()
+    return ride_id
+
+
+def _finish_ride(ride_id: int) -> None:
+    # Frees the rider's active-ride slot for the next round
+    db = SessionLocal()
+    db.query(RideRequest).filter(RideRequest.id == ride_id).update({"status": RideStatus.completed})
+    db.commit()
+    db.close()
+
+
+async def _race(ride_id: int, drivers):
+    """Release every driver at once and return (winners, latencies)."""
+    winners = []
+    latencies = []
+    payload = schemas.RideRequestAction(action="accept")
+
+    async def attempt(driver):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            try:
+                await rides.respond_to_request(ride_id, payload, db=db, current_user=driver)
+                winners.append(driver.id)
+            except HTTPException:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(attempt(driver) for driver in drivers))
+    return winners, latencies
+
+
+async def _contest(rider: User, drivers, rounds: int):
+    all_latencies = []
+    bad_rounds = 0
+    for _ in range(rounds):
+        ride_id = _new_ride(rider)
+        winners, latencies = await _race(ride_id, drivers)
+        all_latencies.extend(latencies)
+        if len(winners) != 1:
+            bad_rounds += 1
+        _finish_ride(ride_id)
+    await async_engine.dispose()
+    return all_latencies, bad_rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=32)
+    parser.add_argument("--rides", type=int, default=20)
+    args = parser.parse_args()
+
+    upgrade_schema(engine)
+    rider, drivers = _seed_users(args.drivers)
+
+    started = time.perf_counter()
+    all_latencies, bad_rounds = asyncio.run(_contest(rider, drivers, args.rides))
+    elapsed = time.perf_counter() - started
+
+    attempts = len(all_latencies)
+    print(f"drivers per ride:   {args.drivers}")
+    print(f"rides contested:    {args.rides}")
+    print(f"rounds with != 1 winner: {bad_rounds}")
+    print(f"throughput:         {attempts / elapsed:.1f} responses/s")
+    print(f"latency p50:        {statistics.median(all_latencies) * 1000:.2f} ms")
+    print(f"latency p95:        {percentile(all_latencies, 95) * 1000:.2f} ms")
+    print(f"latency max:        {max(all_latencies) * 1000:.2f} ms")
+    if bad_rounds:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare the default and fast JSON paths for ride list responses.
+
+Usage: python -m benchmarks.serialization [--rides 1000] [--repeat 20]
+
+Builds in-memory rides shaped like ``rides_with_people`` results and times
+FastAPI's own response handling (response-model validation, ``jsonable_encoder``
+and ``JSONResponse``) against ``ride_to_dict`` + ``FastJSONResponse``. Both
+outputs are checked to be byte-for-byte identical before timing;
+tests/test_serialization.py runs the same check under pytest.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from benchmarks.common import use_temp_database
+
+use_temp_database()
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+from server import schemas  # noqa: E402
+from server.main import app  # noqa: E402
+from server.models import DriverStats, RideRequest, RideStatus, User, UserRole  # noqa: E402
+from server.serialization import FastJSONResponse, orjson, ride_to_dict  # noqa: E402
+
+
+def build_rides(count: int):
+    rng = random.Random(7)
+    now = datetime(2026, 10, 18, 12, 0, 0)
+    drivers = []
+    for i in range(20):
+        driver = User(
+            id=10_000 + i,
+            email=f"driver{i}@howard.edu",
+            full_name=f"Driver Ñame {i}",
+            role=UserRole.driver,
+            university_key="howard",
+            license_plate=f"PLATE{i}",
+        )
+        if i % 2:
+            driver.driver_stats = DriverStats(driver_id=driver.id, rating_count=i, rating_sum=i * 4)
+        drivers.append(driver)
+
+    rides = []
+    for i in range(count):
+        rider = User(id=i + 1, email=f"rider{i}@howard.edu", full_name=f"Rider {i}", role=UserRole.rider, university_key="howard")
+        status = rng.choice(list(RideStatus))
+        ride = RideRequest(
+            id=i + 1,
+            rider=rider,
+            driver=rng.choice(drivers) if status != RideStatus.pending else None,
+            university_key="howard",
+            pickup_location=rng.choice(["Founders Library", "Blackburn Center", "Main Gate"]),
+            destination="Union Station",
+            ride_date=now + timedelta(minutes=rng.randint(0, 10_000), microseconds=rng.randint(0, 999_999)),
+            pickup_lat=38.92 + rng.random() / 100 if i % 3 else None,
+            pickup_lng=-77.02 + rng.random() / 100 if i % 3 else None,
+            status=status,
+            created_at=now - timedelta(seconds=rng.randint(0, 100_000)),
+        )
+        rides.append(ride)
+    return rides
+
+
+def _response_field():
+    for route in app.routes:
+        if getattr(route, "path", None) == "/rides/history":
+            return route.secure_cloned_response_field or route.response_field
+    raise RuntimeError("history route not found")
+
+
+async def _default_body(field, rides) -> bytes:
+    content = await serialize_response(
+        field=field,
+        response_content=schemas.RideRequestListResponse(rides=rides, next_cursor="abc"),
+        is_coroutine=True,
+    )
+    return JSONResponse(content).body
+
+
+def _fast_body(rides) -> bytes:
+    return FastJSONResponse({"rides": [ride_to_dict(ride) for ride in rides], "next_cursor": "abc"}).body
+
+
+def render_both(rides) -> Tuple[bytes, bytes]:
+    """Return the (response model, fast path) bodies of a ride list response."""
+    return asyncio.run(_default_body(_response_field(), rides)), _fast_body(rides)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rides", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rides = build_rides(args.rides)
+    field = _response_field()
+
+    default, fast = render_both(rides)
+    assert fast == default, "fast path output differs from the response model output"
+
+    results = {}
+    for name, render in (
+        ("default", lambda: asyncio.run(_default_body(field, rides))),
+        ("fast", lambda: _fast_body(rides)),
+    ):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            render()
+            best = min(best, time.perf_counter() - start)
+        results[name] = best * 1000 * 1000 / args.rides
+
+    print(f"{args.rides} rides, {len(default)} bytes, encoder: {'orjson' if orjson else 'json'}")
+    print(f"{'path':<10}{'ms / 1k rides':>15}")
+    for name, per_ride in results.items():
+        print(f"{name:<10}{per_ride:>15.2f}")
+    print(f"speedup: {results['default'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
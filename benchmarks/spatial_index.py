@@ -0,0 +1,72 @@
+"""Compare grid-index nearest-pickup queries against a linear scan.
+
+Usage: python -m benchmarks.spatial_index [--points 20000] [--queries 2000] [--radius 2000] [--limit 20]
+
+Pending pickups are scattered around one campus; each query asks for the
+closest ``limit`` pickups within ``radius`` meters of a random point.
+"""
+import argparse
+import random
+import time
+
+from server.geo import GridIndex, haversine_m
+
+CAMPUS = (38.9227, -77.0194)
+SPREAD_DEGREES = 0.05
+
+
+def _random_point(rng: random.Random):
+    return (CAMPUS[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES), CAMPUS[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES))
+
+
+def _linear_nearest(points, point, radius_m, limit):
+    found = []
+    for item_id, item_point in points.items():
+        distance = haversine_m(point, item_point)
+        if distance <= radius_m:
+            found.append((distance, item_id))
+    found.sort()
+    return [(item_id, distance) for distance, item_id in found[:limit]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--radius", type=float, default=2_000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    points = {item_id: _random_point(rng) for item_id in range(args.points)}
+    grid = GridIndex()
+    for item_id, point in points.items():
+        grid.add(item_id, point)
+    queries = [_random_point(rng) for _ in range(args.queries)]
+
+    # Linear scans are slow; time a sample of them and check the grid agrees
+    linear_queries = queries[: max(1, args.queries // 20)]
+    for point in linear_queries:
+        expected = [item_id for item_id, _ in _linear_nearest(points, point, args.radius, args.limit)]
+        actual = [item_id for item_id, _ in grid.nearest(point, args.radius, args.limit)]
+        assert actual == expected, "grid index disagrees with linear scan"
+
+    results = {}
+    for name, nearest, sample in (
+        ("grid", lambda p: grid.nearest(p, args.radius, args.limit), queries),
+        ("linear", lambda p: _linear_nearest(points, p, args.radius, args.limit), linear_queries),
+    ):
+        start = time.perf_counter()
+        for point in sample:
+            nearest(point)
+        results[name] = (time.perf_counter() - start) / len(sample) * 1e6
+
+    print(f"{args.points} points, radius {args.radius:.0f} m, limit {args.limit}")
+    print(f"{'index':<10}{'us/query':>12}")
+    for name, micros in results.items():
+        print(f"{name:<10}{micros:>12.1f}")
+    print(f"speedup: {results['linear'] / results['grid']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Compare read/write throughput of the default and production SQLite profiles.
+
+Usage: python -m benchmarks.sqlite_profiles [--seconds 5] [--readers 16] [--writers 4]
+
+Each profile gets its own throwaway database seeded with pending rides. Reader
+tasks run the pending-queue query and writer tasks commit ride updates, one
+session per operation as a request would.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from server.database import Base, build_engines
+from server.models import RideRequest, RideStatus, User, UserRole
+
+UNIVERSITY = "howard"
+PROFILES = ["default", "production"]
+
+
+def _seed(sync_engine, rides: int) -> None:
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "email": f"bench-{i}@howard.edu",
+                    "hashed_password": "x",
+                    "full_name": f"Bench Rider {i}",
+                    "role": UserRole.rider,
+                    "university_key": UNIVERSITY,
+                    "is_verified": True,
+                }
+                for i in range(rides)
+            ],
+        )
+        start = datetime.utcnow()
+        conn.execute(
+            RideRequest.__table__.insert(),
+            [
+                {
+                    "rider_id": i + 1,
+                    "university_key": UNIVERSITY,
+                    "pickup_location": "Library",
+                    "destination": "Stadium",
+                    "ride_date": start + timedelta(minutes=i),
+                    "status": RideStatus.pending,
+                }
+                for i in range(rides)
+            ],
+        )
+
+
+async def _run(async_engine, seconds: float, readers: int, writers: int, rides: int):
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        query = (
+            select(RideRequest)
+            .where(RideRequest.university_key == UNIVERSITY, RideRequest.status == RideStatus.pending)
+            .order_by(RideRequest.ride_date)
+            .limit(50)
+        )
+        while time.perf_counter() < deadline:
+            try:
+                async with sessions() as db:
+                    (await db.execute(query)).scalars().all()
+                counts["reads"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            ride_id = random.randint(1, rides)
+            try:
+                async with sessions() as db:
+                    await db.execute(
+                        update(RideRequest)
+                        .where(RideRequest.id == ride_id)
+                        .values(pickup_location=f"Gate {random.randint(1, 9)}")
+                    )
+                    await db.commit()
+                counts["writes"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    await asyncio.gather(*[reader() for _ in range(readers)], *[writer() for _ in range(writers)])
+    await async_engine.dispose()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--rides", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'reads/s':>12}{'writes/s':>12}{'errors':>10}")
+    for profile in PROFILES:
+        path = tempfile.mkdtemp(prefix="quaddash-sqlite-")
+        sync_engine, async_engine = build_engines(f"sqlite:///{path}/bench.db", profile)
+        _seed(sync_engine, args.rides)
+        sync_engine.dispose()
+        counts = asyncio.run(_run(async_engine, args.seconds, args.readers, args.writers, args.rides))
+        print(
+            f"{profile:<12}{counts['reads'] / args.seconds:>12.1f}"
+            f"{counts['writes'] / args.seconds:>12.1f}{counts['errors']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Check how many SQL statements each write (and a few reads) issues.
+
+Usage: python -m benchmarks.statement_counts
+
+tests/test_statement_counts.py runs the same checks under pytest.
+
+Runs one rider/driver flow in-process against a throwaway SQLite database
+and reads each response's statement count from the Server-Timing header.
+Authenticated requests are measured with warm auth caches, so the counts
+cover the endpoint's own work. Exits non-zero if any endpoint goes over
+its budget in ``BUDGETS``; lower a budget whenever an endpoint gets cheaper.
+
+The list endpoints in ``CONSTANT`` are also measured with one ride and with
+``MANY_RIDES`` rides, and must issue the same number of statements for both:
+a count that grows with the page means a lazy load crept back in (N+1).
+"""
+import asyncio
+import os
+import re
+import sys
+from typing import Dict, Tuple
+
+from benchmarks.common import use_temp_database
+
+use_temp_database()
+os.environ.setdefault("APP_SERVER_TIMING_HEADER", "true")
+os.environ.setdefault("APP_AUTH_THROTTLE_ENABLED", "false")
+os.environ.setdefault("APP_BCRYPT_ROUNDS", "4")
+
+import httpx  # noqa: E402
+
+from server.main import app  # noqa: E402
+from server.pending_queue import pending_queue  # noqa: E402
+
+UNIVERSITY = "howard"
+DOMAIN = "howard.edu"
+RIDE = {"pickup_location": "Founders Library", "destination": "Union Station", "ride_date": "2030-01-01T10:00:00"}
+
+BUDGETS = {
+    "POST /auth/register": 2,  # duplicate-email check, INSERT
+    "POST /auth/login": 1,
+    "POST /rides/": 1,  # INSERT ... RETURNING
+    "GET /rides/pending": 0,  # served from the in-memory queue
+    "POST /rides/{id}/respond accept": 2,  # UPDATE ... RETURNING, load rider and driver
+    "POST /rides/{id}/respond decline": 2,
+    "POST /rides/{id}/complete": 2,
+    "POST /rides/{id}/cancel pending": 1,  # UPDATE ... RETURNING; rider is the caller, no driver yet
+    "POST /rides/{id}/cancel accepted": 3,  # missed pending UPDATE, accepted UPDATE, load driver
+    "POST /rides/{id}/review": 3,  # load ride, INSERT ... RETURNING, rating upsert
+    "GET /rides/{id}/review": 2,
+    "GET /rides/history": 1,
+}
+
+# List endpoints whose statement count must not grow with the number of rides returned
+CONSTANT = ("GET /rides/pending (SQL)", "GET /rides/my-accepted", "GET /rides/history")
+MANY_RIDES = 30
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class Counter:
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.counts = {}
+
+    async def request(self, method: str, url: str, label: str = None, token: str = None, **kwargs) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = await self.client.request(method, url, headers=headers, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} failed: {response.status_code} {response.text}")
+        if label:
+            self.counts[label] = int(_QUERIES.search(response.headers["server-timing"]).group(1))
+        return response
+
+
+async def _register(counter: Counter, name: str, role: str, label: str = None) -> str:
+    payload = {
+        "email": f"{name}@{DOMAIN}",
+        "password": "statement-count",
+        "full_name": name.title(),
+        "role": role,
+        "university_key": UNIVERSITY,
+        "license_plate": "QD 1234" if role == "driver" else None,
+    }
+    token = (await counter.request("POST", "/auth/register", label, json=payload)).json()["access_token"]
+    await counter.request("GET", "/auth/me", token=token)  # warm the user cache
+    return token
+
+
+async def _flow(counter: Counter) -> None:
+    rider = await _register(counter, "rider", "rider", "POST /auth/register")
+    other_rider = await _register(counter, "other", "rider")
+    driver = await _register(counter, "driver", "driver")
+    await counter.request("POST", "/auth/login", "POST /auth/login", json={"email": f"rider@{DOMAIN}", "password": "statement-count"})
+
+    ride = (await counter.request("POST", "/rides/", "POST /rides/", token=rider, json=RIDE)).json()["id"]
+    await counter.request("GET", "/rides/pending", "GET /rides/pending", token=driver)
+    accept = {"action": "accept"}
+    await counter.request("POST", f"/rides/{ride}/respond", "POST /rides/{id}/respond accept", token=driver, json=accept)
+    await counter.request("POST", f"/rides/{ride}/complete", "POST /rides/{id}/complete", token=driver)
+    review = {"rating": 5, "comment": "Smooth ride"}
+    await counter.request("POST", f"/rides/{ride}/review", "POST /rides/{id}/review", token=rider, json=review)
+    await counter.request("GET", f"/rides/{ride}/review", "GET /rides/{id}/review", token=driver)
+
+    ride = (await counter.request("POST", "/rides/", token=rider, json=RIDE)).json()["id"]
+    await counter.request("POST", f"/rides/{ride}/cancel", "POST /rides/{id}/cancel pending", token=rider)
+
+    ride = (await counter.request("POST", "/rides/", token=other_rider, json=RIDE)).json()["id"]
+    await counter.request("POST", f"/rides/{ride}/respond", token=driver, json=accept)
+    await counter.request("POST", f"/rides/{ride}/cancel", "POST /rides/{id}/cancel accepted", token=other_rider)
+
+    ride = (await counter.request("POST", "/rides/", token=rider, json=RIDE)).json()["id"]
+    decline = {"action": "decline"}
+    await counter.request("POST", f"/rides/{ride}/respond", "POST /rides/{id}/respond decline", token=driver, json=decline)
+
+    # The first call also lists archive tables, which happens at most every archive_catalog_refresh_seconds
+    await counter.request("GET", "/rides/history", token=rider)
+    await counter.request("GET", "/rides/history", "GET /rides/history", token=rider)
+
+
+async def _list_counts(counter: Counter, name: str, rides: int) -> dict:
+    """Count the list endpoints' statements for a fresh driver with ``rides`` rides in each list."""
+    driver = await _register(counter, f"{name}-driver", "driver")
+    riders = [await _register(counter, f"{name}-rider-{index}", "rider") for index in range(rides)]
+    ride_ids = [(await counter.request("POST", "/rides/", token=rider, json=RIDE)).json()["id"] for rider in riders]
+
+    sizes = Counter(counter.client)
+    # Force the SQL path that serves /pending until the in-memory queue is ready
+    pending_queue.ready = False
+    try:
+        pending = await sizes.request("GET", "/rides/pending", "GET /rides/pending (SQL)", token=driver)
+    finally:
+        pending_queue.ready = True
+    for ride in ride_ids:
+        await counter.request("POST", f"/rides/{ride}/respond", token=driver, json={"action": "accept"})
+    accepted = await sizes.request("GET", "/rides/my-accepted", "GET /rides/my-accepted", token=driver)
+    for ride in ride_ids:
+        await counter.request("POST", f"/rides/{ride}/complete", token=driver)
+    history = await sizes.request("GET", "/rides/history", "GET /rides/history", token=driver)
+
+    returned = {len(pending.json()["rides"]), len(accepted.json()["rides"]), len(history.json()["rides"])}
+    if returned != {rides}:
+        raise RuntimeError(f"expected {rides} rides in every list, got {returned}")
+    return sizes.counts
+
+
+async def measure() -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+    """Run the flow and the list checks in-process against the app.
+
+    Returns the per-endpoint counts, then the ``CONSTANT`` list counts for one
+    ride and for ``MANY_RIDES`` rides. Registers fixed emails, so it can run
+    only once per database.
+    """
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            counter = Counter(client)
+            await _flow(counter)
+            one = await _list_counts(counter, "single", 1)
+            many = await _list_counts(counter, "many", MANY_RIDES)
+    return counter.counts, one, many
+
+
+async def main() -> int:
+    counts, one, many = await measure()
+
+    failed = False
+    print(f"{'endpoint':<36} {'statements':>10} {'budget':>7}")
+    for label, budget in BUDGETS.items():
+        count = counts[label]
+        over = count > budget
+        failed = failed or over
+        print(f"{label:<36} {count:>10} {budget:>7}{'  OVER BUDGET' if over else ''}")
+
+    print()
+    print(f"{'list endpoint':<36} {'1 ride':>10} {f'{MANY_RIDES} rides':>10}")
+    for label in CONSTANT:
+        grows = many[label] != one[label]
+        failed = failed or grows
+        print(f"{label:<36} {one[label]:>10} {many[label]:>10}{'  GROWS WITH RIDES' if grows else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -39,18 +39,39 @@ export const authApi = {
   getMe: () => apiClient.get('/auth/me'),
 };
 
+// List endpoints return one page at a time; follow next_cursor so callers get every ride
+const PAGE_SIZE = 200;
+const getAllRides = async (url) => {
+  const rides = [];
+  let cursor;
+  do {
+    const { data } = await apiClient.get(url, { params: { limit: PAGE_SIZE, cursor } });
+    rides.push(...data.rides);
+    cursor = data.next_cursor;
+  } while (cursor);
+  return rides;
+};
+
 // Rides API
 export const ridesApi = {
   createRequest: (data) => apiClient.post('/rides/', data),
   getMyRequest: () => apiClient.get('/rides/my-request'),
-  getPendingRequests: () => apiClient.get('/rides/pending'),
+  getPendingRequests: () => getAllRides('/rides/pending'),
   respondToRequest: (rideId, action) =>
     apiClient.post(`/rides/${rideId}/respond`, { action }),
-  getMyAcceptedRides: () => apiClient.get('/rides/my-accepted'),
+  getMyAcceptedRides: () => getAllRides('/rides/my-accepted'),
   cancelRide: (rideId) => apiClient.post(`/rides/${rideId}/cancel`),
   completeRide: (rideId) => apiClient.post(`/rides/${rideId}/complete`),
   submitReview: (rideId, data) => apiClient.post(`/rides/${rideId}/review`, data),
   getReview: (rideId) => apiClient.get(`/rides/${rideId}/review`),
+  getEventsToken: () => apiClient.post('/rides/events/token'),
+  // EventSource cannot send headers, so a short-lived stream token from
+  // getEventsToken travels as a query param instead of the login token
+  eventsUrl: (streamToken) => {
+    const url = new URL('rides/events', API_BASE_URL.endsWith('/') ? API_BASE_URL : `${API_BASE_URL}/`);
+    url.searchParams.set('access_token', streamToken);
+    return url.toString();
+  },
 };
 
 export default apiClient;
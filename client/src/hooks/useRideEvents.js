@@ -0,0 +1,102 @@
+import { useEffect, useRef } from 'react';
+import { ridesApi } from '../api/client';
+
+// Subscribe to the server's ride event stream and call onChange whenever one
+// of the given events arrives. Falls back to polling every fallbackMs while
+// the stream is unavailable, and keeps a slow safety-net poll while it is up
+// in case an event never reaches this connection. Stream tokens expire within
+// a minute, so every reconnect fetches a fresh one instead of letting
+// EventSource retry the old URL.
+const RECONNECT_MS = 5000;
+const SAFETY_NET_MS = 60000;
+// Bursts of events (a bulk call, a dispatch run) collapse into one refetch
+const DEBOUNCE_MS = 500;
+
+export function useRideEvents(eventNames, onChange, fallbackMs) {
+  const onChangeRef = useRef(onChange);
+
+  useEffect(() => {
+    onChangeRef.current = onChange;
+  }, [onChange]);
+
+  const eventKey = eventNames.join(',');
+
+  useEffect(() => {
+    let pollInterval = null;
+    let pollMs = null;
+    const pollEvery = (ms) => {
+      if (ms === pollMs) return;
+      clearInterval(pollInterval);
+      pollMs = ms;
+      pollInterval = ms ? setInterval(() => onChangeRef.current(), ms) : null;
+    };
+    const startPolling = () => pollEvery(fallbackMs);
+    const slowPolling = () => pollEvery(fallbackMs ? Math.max(fallbackMs, SAFETY_NET_MS) : null);
+    const stopPolling = () => pollEvery(null);
+
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+      return stopPolling;
+    }
+
+    let source = null;
+    let reconnectTimer = null;
+    let debounceTimer = null;
+    let cancelled = false;
+    const handler = () => {
+      if (debounceTimer) return;
+      debounceTimer = setTimeout(() => {
+        debounceTimer = null;
+        onChangeRef.current();
+      }, DEBOUNCE_MS);
+    };
+    const names = eventKey.split(',');
+
+    const scheduleReconnect = () => {
+      startPolling();
+      if (!cancelled && !reconnectTimer) {
+        reconnectTimer = setTimeout(() => {
+          reconnectTimer = null;
+          connect();
+        }, RECONNECT_MS);
+      }
+    };
+
+    const connect = async () => {
+      let streamToken;
+      try {
+        streamToken = (await ridesApi.getEventsToken()).data.access_token;
+      } catch {
+        scheduleReconnect();
+        return;
+      }
+      if (cancelled) return;
+
+      source = new EventSource(ridesApi.eventsUrl(streamToken));
+      names.forEach((name) => source.addEventListener(name, handler));
+      source.addEventListener('ready', () => {
+        slowPolling();
+        // Catch up on anything that changed while we were disconnected
+        onChangeRef.current();
+      });
+      source.onerror = () => {
+        source.close();
+        source = null;
+        scheduleReconnect();
+      };
+    };
+
+    connect();
+
+    return () => {
+      cancelled = true;
+      clearTimeout(reconnectTimer);
+      clearTimeout(debounceTimer);
+      if (source) {
+        names.forEach((name) => source.removeEventListener(name, handler));
+        source.close();
+      }
+      stopPolling();
+    };
+  }, [eventKey, fallbackMs]);
+}
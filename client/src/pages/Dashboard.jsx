@@ -1,5 +1,6 @@
 import { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../hooks/useAuth';
+import { useRideEvents } from '../hooks/useRideEvents';
 import { ridesApi } from '../api/client';
 import RideRequestForm from '../components/rider/RideRequestForm';
 import RideStatusCard from '../components/rider/RideStatusCard';
@@ -32,13 +33,9 @@ function RiderDashboard() {
     fetchMyRequest();
   }, [fetchMyRequest]);
 
-  // Auto-refresh every 10 seconds if there is any active request
-  useEffect(() => {
-    if (activeRequest) {
-      const interval = setInterval(fetchMyRequest, 10000);
-      return () => clearInterval(interval);
-    }
-  }, [activeRequest, fetchMyRequest]);
+  // Refresh when the server reports a change, polling every 10 seconds only
+  // while the event stream is unavailable
+  useRideEvents(['ride_updated'], fetchMyRequest, activeRequest ? 10000 : null);
 
   if (loading) {
     return (
@@ -73,12 +70,12 @@ function DriverDashboard() {
 
   const fetchData = useCallback(async () => {
     try {
-      const [pendingRes, acceptedRes] = await Promise.all([
+      const [pending, accepted] = await Promise.all([
         ridesApi.getPendingRequests(),
         ridesApi.getMyAcceptedRides(),
       ]);
-      setPendingRequests(pendingRes.data.rides);
-      setAcceptedRides(acceptedRes.data.rides);
+      setPendingRequests(pending);
+      setAcceptedRides(accepted);
     } catch (err) {
       console.error('Failed to fetch rides:', err);
     } finally {
@@ -90,11 +87,9 @@ function DriverDashboard() {
     fetchData();
   }, [fetchData]);
 
-  // Auto-refresh every 15 seconds
-  useEffect(() => {
-    const interval = setInterval(fetchData, 15000);
-    return () => clearInterval(interval);
-  }, [fetchData]);
+  // Refresh when the server reports a change, polling every 15 seconds only
+  // while the event stream is unavailable
+  useRideEvents(['ride_updated', 'pending_changed'], fetchData, 15000);
 
   const handleCompleteRide = async (rideId) => {
     setCompletingRideId(rideId);
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, inspect, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .models import RideRequest, RideStatus, Review, User
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = [RideStatus.completed, RideStatus.cancelled, RideStatus.declined]
+RIDES_PREFIX = "ride_requests_archive_"
+REVIEWS_PREFIX = "reviews_archive_"
+
+# Archive tables live outside Base.metadata so create_all never touches them
+archive_metadata = MetaData()
+
+
+def month_suffix(ride_date: datetime) -> str:
+    return f"{ride_date.year:04d}_{ride_date.month:02d}"
+
+
+def _copy_columns(table: Table) -> List[Column]:
+    # Same columns and types, without foreign keys: archived rows may outlive the users they reference
+    return [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in table.columns
+    ]
+
+
+class ArchiveCatalog:
+    """Per-month archive tables for finished rides and their reviews.
+
+    Rides are partitioned by the month of their ``ride_date``. The list of
+    months that exist is read from the database at most every
+    ``refresh_seconds``, so archives created by another process show up
+    without a restart.
+    """
+
+    def __init__(self, refresh_seconds: float = settings.archive_catalog_refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Tuple[Table, Table]] = {}
+        self._months: List[str] = []
+        self._next_refresh = 0.0
+
+    def tables(self, month: str) -> Tuple[Table, Table]:
+        """Return the (rides, reviews) archive tables for a month, defining them if needed."""
+        with self._lock:
+            if month not in self._tables:
+                rides = Table(f"{RIDES_PREFIX}{month}", archive_metadata, *_copy_columns(RideRequest.__table__))
+                Index(f"ix_{rides.name}_rider_date", rides.c.rider_id, rides.c.ride_date)
+                Index(f"ix_{rides.name}_driver_date", rides.c.driver_id, rides.c.ride_date)
+                reviews = Table(f"{REVIEWS_PREFIX}{month}", archive_metadata, *_copy_columns(Review.__table__))
+                Index(f"ix_{reviews.name}_ride_id", reviews.c.ride_id, unique=True)
+                self._tables[month] = (rides, reviews)
+            return self._tables[month]
+
+    async def ensure(self, db: AsyncSession, month: str) -> Tuple[Table, Table]:
+        rides, reviews = self.tables(month)
+        connection = await db.connection()
+        await connection.run_sync(lambda sync: (rides.create(sync, checkfirst=True), reviews.create(sync, checkfirst=True)))
+        with self._lock:
+            if month not in self._months:
+                self._months = sorted(self._months + [month], reverse=True)
+        return rides, reviews
+
+    async def months(self, db: AsyncSession) -> List[str]:
+        """Archived months, newest first."""
+        if time.monotonic() >= self._next_refresh:
+            connection = await db.connection()
+            names = await connection.run_sync(lambda sync: inspect(sync).get_table_names())
+            months = sorted((name[len(RIDES_PREFIX):] for name in names if name.startswith(RIDES_PREFIX)), reverse=True)
+            with self._lock:
+                self._months = months
+                self._next_refresh = time.monotonic() + self.refresh_seconds
+        return self._months
+
+
+catalog = ArchiveCatalog()
+
+
+async def finished_rides_entity(db: AsyncSession, participant: str, user_id: int):
+    """Return an entity covering a user's finished rides in the live and archive tables.
+
+    ``participant`` is ``"rider_id"`` or ``"driver_id"``. Without archives this
+    is just ``RideRequest``; otherwise it is ``RideRequest`` aliased to a UNION
+    ALL of the live table and every archive month, each filtered on its own
+    (participant, ride_date) index, so callers can query and eager-load it
+    like the model.
+    """
+    months = await catalog.months(db)
+    if not months:
+        return RideRequest
+
+    live = RideRequest.__table__
+    parts = [
+        select(*live.c).where(live.c[participant] == user_id, live.c.status.in_(FINISHED_STATUSES))
+    ]
+    for month in months:
+        rides, _ = catalog.tables(month)
+        parts.append(select(*[rides.c[column.name] for column in live.c]).where(rides.c[participant] == user_id))
+    return aliased(RideRequest, union_all(*parts).subquery("rides_with_archive"))
+
+
+async def find_archived_ride(db: AsyncSession, ride_id: int) -> Optional[Tuple[str, dict]]:
+    """Look a ride id up across archive months; returns (month, row) or None."""
+    months = await catalog.months(db)
+    if not months:
+        return None
+    parts = []
+    for month in months:
+        rides, _ = catalog.tables(month)
+        parts.append(select(*rides.c, literal(month).label("archive_month")).where(rides.c.id == ride_id))
+    row = (await db.execute(union_all(*parts))).mappings().first()
+    if row is None:
+        return None
+    return row["archive_month"], dict(row)
+
+
+async def find_archived_review(db: AsyncSession, month: str, ride_id: int) -> Optional[Review]:
+    """Return the archived review for a ride as a transient Review with its reviewer loaded, or None."""
+    _, reviews = catalog.tables(month)
+    row = (await db.execute(select(reviews).where(reviews.c.ride_id == ride_id))).mappings().first()
+    if row is None:
+        return None
+    review = Review(**row)
+    review.reviewer = await db.get(User, review.reviewer_id)
+    return review
+
+
+async def archive_batch(limit: int = settings.archive_batch_size) -> int:
+    """Move up to ``limit`` old finished rides and their reviews into the archive.
+
+    Each batch is its own short transaction so writers are only held up for
+    one batch at a time. Returns how many rides were moved.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.archive_after_days)
+    live = RideRequest.__table__
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(live)
+                .where(
+                    live.c.status.in_(FINISHED_STATUSES),
+                    live.c.ride_date < cutoff,
+                    # Keep the newest row so SQLite never hands out an archived id again
+                    live.c.id < select(func.max(live.c.id)).scalar_subquery(),
+                )
+                .order_by(live.c.ride_date, live.c.id)
+                .limit(limit)
+            )
+        ).mappings().all()
+        if not rows:
+            return 0
+
+        by_month: Dict[str, List[dict]] = {}
+        for row in rows:
+            by_month.setdefault(month_suffix(row["ride_date"]), []).append(dict(row))
+
+        for month, month_rows in by_month.items():
+            archive_rides, archive_reviews = await catalog.ensure(db, month)
+            ride_ids = [row["id"] for row in month_rows]
+            # Copy rides first: that takes the write lock, so no review can slip in before they are deleted
+            await db.execute(archive_rides.insert(), month_rows)
+            reviews = (
+                await db.execute(select(Review.__table__).where(Review.__table__.c.ride_id.in_(ride_ids)))
+            ).mappings().all()
+            if reviews:
+                await db.execute(archive_reviews.insert(), [dict(review) for review in reviews])
+                await db.execute(delete(Review.__table__).where(Review.__table__.c.ride_id.in_(ride_ids)))
+            await db.execute(delete(live).where(live.c.id.in_(ride_ids)))
+        await db.commit()
+    return len(rows)
+
+
+async def archive_loop() -> None:
+    """Archive old finished rides every ``archive_interval_seconds``, one bounded batch at a time."""
+    while True:
+        try:
+            moved = settings.archive_batch_size
+            total = 0
+            while moved >= settings.archive_batch_size:
+                moved = await archive_batch()
+                total += moved
+                # Give waiting writers a turn between batches
+                await asyncio.sleep(settings.archive_batch_pause_seconds)
+            if total:
+                logger.info("Archived %d finished rides", total)
+        except Exception:
+            logger.exception("Ride archival failed")
+        await asyncio.sleep(settings.archive_interval_seconds)
@@ -1,18 +1,31 @@
 import secrets
-from typing import List
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import schemas
+from .auth_cache import snapshot_user, user_cache, user_from_snapshot
 from .config import settings
 from .database import get_db
 from .models import User
-from .security import create_access_token, decode_token, hash_password, verify_password
+from .security import (
+    PasswordHasherBusy,
+    STREAM_SCOPE,
+    create_access_token,
+    decode_token,
+    hash_password,
+    verify_and_update_password,
+)
+from .throttle import throttle_auth_attempt
+from .universities import registry
+from .versions import etag_matches
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
 def _validate_university_email(email: str, university_key: str) -> str:
@@ -26,55 +39,102 @@ def _validate_university_email(email: str, university_key: str) -> str:
             detail="Only .edu email addresses are allowed"
         )
 
-    university = settings.universities.get(university_key)
+    university = registry.get(university_key)
     if not university:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown university"
         )
 
-    allowed_domains: List[str] = [d.lower() for d in university.get("domains", [])]
-    if domain not in allowed_domains:
+    # Subdomains such as cs.howard.edu count as the school's domain
+    if registry.match_domain(domain) != university_key:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email must use a school domain"
         )
 
-    return university["name"]
+    return university.name
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+async def _get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email.lower()))
+    return result.scalars().first()
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
     """Dependency to get the current authenticated user."""
-    user_id = decode_token(token)
+    return await _load_user(db, decode_token(token))
+
+
+async def _load_user(db: AsyncSession, user_id: Optional[str]) -> User:
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    snapshot = user_cache.get(int(user_id))
+    if snapshot is not None:
+        return user_from_snapshot(snapshot)
+
+    user = await db.get(User, int(user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    user_cache.set(user.id, snapshot_user(user))
     return user
 
 
+async def get_stream_user(
+    access_token: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> User:
+    """Like get_current_user, but also accepts a stream token as a query parameter.
+
+    Browsers' EventSource cannot send an Authorization header, so event streams
+    pass a short-lived token from ``POST /rides/events/token`` as
+    ``?access_token=`` instead. Only stream-scoped tokens are accepted there,
+    so the URL (and any log line recording it) never carries a reusable
+    access token.
+    """
+    if token:
+        return await get_current_user(db=db, token=token)
+    if not access_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return await _load_user(db, decode_token(access_token, scope=STREAM_SCOPE))
+
+
 @router.get("/universities", response_model=schemas.UniversitiesResponse)
-def list_universities():
-    universities = [
-        schemas.University(key=key, name=info["name"], domains=info.get("domains", []))
-        for key, info in settings.universities.items()
-    ]
-    return schemas.UniversitiesResponse(universities=universities)
+async def list_universities(request: Request):
+    payload, etag = registry.payload()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.universities_cache_max_age_seconds}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(payload: schemas.RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: Request, payload: schemas.RegisterRequest, db: AsyncSession = Depends(get_db)):
     """Register a user and mark them as verified immediately."""
+    throttle_auth_attempt(request, payload.email)
     _validate_university_email(payload.email, payload.university_key)
 
-    user = db.query(User).filter(User.email == payload.email.lower()).first()
+    user = await _get_user_by_email(db, payload.email)
     if user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
+    try:
+        hashed_password = await hash_password(payload.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
     user = User(
         email=payload.email.lower(),
-        hashed_password=hash_password(payload.password),
+        hashed_password=hashed_password,
         full_name=payload.full_name,
         role=payload.role,
         university_key=payload.university_key,
@@ -82,23 +142,36 @@ def register(payload: schemas.RegisterRequest, db: Session = Depends(get_db)):
         is_verified=True  # mark as verified immediately
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # The id is assigned at flush and expire_on_commit is off, so no refresh round trip is needed
+    await db.commit()
 
     token = create_access_token(subject=str(user.id))
     return {"message": "Registration successful", "access_token": token}
 
 
 @router.post("/login", response_model=schemas.TokenResponse)
-def login(payload: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email.lower()).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login(request: Request, payload: schemas.LoginRequest, db: AsyncSession = Depends(get_db)):
+    throttle_auth_attempt(request, payload.email)
+    user = await _get_user_by_email(db, payload.email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    try:
+        verified, new_hash = await verify_and_update_password(payload.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    # Transparently upgrade hashes made with an older work factor
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
     token = create_access_token(subject=str(user.id))
     return schemas.TokenResponse(access_token=token)
 
 
 @router.get("/me", response_model=schemas.UserOut)
-def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: User = Depends(get_current_user)):
     return current_user
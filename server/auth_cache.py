@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from .bus import bus
+from .config import settings
+from .models import User
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire at a per-entry deadline."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """Store ``value``; ``expires_at`` is a wall-clock timestamp capping the TTL."""
+        ttl = self.ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+token_cache = TTLCache(settings.auth_token_cache_size, settings.auth_token_cache_ttl_seconds)
+user_cache = TTLCache(settings.auth_user_cache_size, settings.auth_user_cache_ttl_seconds)
+
+_USER_COLUMNS = [column.key for column in inspect(User).column_attrs]
+
+
+def snapshot_user(user: User) -> Dict[str, Any]:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+def user_from_snapshot(snapshot: Dict[str, Any]) -> User:
+    """Rebuild a detached User so cached hits behave like a freshly loaded row."""
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session, flush_context):
+    changed = {obj.id for obj in session.dirty | session.deleted if isinstance(obj, User)}
+    if changed:
+        for user_id in changed:
+            user_cache.invalidate(user_id)
+        # Drop them again once committed, in case a concurrent request re-cached the old row
+        session.info.setdefault("changed_user_ids", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    # Through the bus, so other workers drop their cached copies too
+    for user_id in session.info.pop("changed_user_ids", ()):
+        bus.publish("user_changed", {"user_id": user_id})
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session):
+    session.info.pop("changed_user_ids", None)
+
+
+bus.subscribe("user_changed", lambda change: user_cache.invalidate(change["user_id"]))
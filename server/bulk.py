@@ -0,0 +1,214 @@
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import schemas
+from .auth import get_current_user
+from .config import settings
+from .database import dialect_insert, get_db
+from .geo import landmarks
+from .models import RideRequest, RideStatus, User, UserRole
+from .rides import record_ride_changes, rides_with_people
+
+# Included before the rides router so /rides/bulk/... is not taken for /rides/{ride_id}/...
+router = APIRouter(prefix="/rides/bulk", tags=["rides"])
+
+
+def _require_coordinator(current_user: User, item_count: int) -> None:
+    if current_user.email.lower() not in {email.lower() for email in settings.coordinator_emails}:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only coordinators can run bulk ride operations",
+        )
+    if item_count > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.bulk_max_items} items",
+        )
+
+
+async def _load_rides(db: AsyncSession, ride_ids: List[int]) -> Dict[int, RideRequest]:
+    if not ride_ids:
+        return {}
+    result = await db.execute(rides_with_people().where(RideRequest.id.in_(ride_ids)))
+    return {ride.id: ride for ride in result.scalars().all()}
+
+
+def _bulk_result(results: List[schemas.BulkItemResult]) -> schemas.BulkResult:
+    succeeded = sum(1 for result in results if result.ok)
+    return schemas.BulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+@router.post("", response_model=schemas.BulkResult)
+async def bulk_create_ride_requests(
+    payload: schemas.BulkRideCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create ride requests for many riders of the coordinator's university at once.
+
+    All rides are written by one multi-row INSERT in one transaction. Items
+    for unknown riders, or riders who already have an active ride, fail
+    individually without affecting the rest of the batch.
+    """
+    _require_coordinator(current_user, len(payload.rides))
+
+    emails = {item.rider_email.lower() for item in payload.rides}
+    result = await db.execute(
+        select(User.email, User.id).where(
+            User.email.in_(emails),
+            User.university_key == current_user.university_key,
+            User.role == UserRole.rider,
+        )
+    )
+    rider_ids = dict(result.all())
+
+    errors: Dict[int, str] = {}
+    rows = []
+    row_indexes: Dict[int, int] = {}  # rider_id -> item index
+    now = datetime.utcnow()
+    for index, item in enumerate(payload.rides):
+        rider_id = rider_ids.get(item.rider_email.lower())
+        if rider_id is None:
+            errors[index] = "No rider with this email at your university"
+            continue
+        if rider_id in row_indexes:
+            errors[index] = "Rider appears more than once in this batch"
+            continue
+
+        pickup_point = None
+        if item.pickup_lat is not None:
+            pickup_point = (item.pickup_lat, item.pickup_lng)
+        else:
+            pickup_point = landmarks.resolve(current_user.university_key, item.pickup_location)
+        row_indexes[rider_id] = index
+        rows.append(
+            {
+                "rider_id": rider_id,
+                "coordinator_id": current_user.id,
+                "university_key": current_user.university_key,
+                "pickup_location": item.pickup_location,
+                "destination": item.destination,
+                "ride_date": item.ride_date,
+                "pickup_lat": pickup_point[0] if pickup_point else None,
+                "pickup_lng": pickup_point[1] if pickup_point else None,
+                "status": RideStatus.pending,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+
+    created: Dict[int, int] = {}  # item index -> ride id
+    if rows:
+        # Riders with an active ride hit the partial unique index and are skipped, not fatal
+        insert = dialect_insert(db)
+        result = await db.execute(
+            insert(RideRequest)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(RideRequest.id, RideRequest.rider_id)
+        )
+        created = {row_indexes[rider_id]: ride_id for ride_id, rider_id in result.all()}
+        await db.commit()
+    for index in row_indexes.values():
+        if index not in created:
+            errors[index] = "Rider already has an active ride request"
+
+    rides = await _load_rides(db, list(created.values()))
+    record_ride_changes(list(rides.values()), pending_changed=True)
+
+    return _bulk_result(
+        [
+            schemas.BulkItemResult(index=index, ok=True, ride=rides[created[index]])
+            if index in created
+            else schemas.BulkItemResult(index=index, ok=False, error=errors[index])
+            for index in range(len(payload.rides))
+        ]
+    )
+
+
+@router.post("/respond", response_model=schemas.BulkResult)
+async def bulk_respond_to_requests(
+    payload: schemas.BulkRespond,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Accept (assigning a driver) or decline many pending rides in one transaction.
+
+    Updates are issued as one UPDATE per driver plus one for all declines,
+    each guarded on the ride still being pending, so rides taken in the
+    meantime fail individually.
+    """
+    _require_coordinator(current_user, len(payload.items))
+
+    driver_ids = {item.driver_id for item in payload.items if item.action == "accept"}
+    valid_drivers = set()
+    if driver_ids:
+        result = await db.execute(
+            select(User.id).where(
+                User.id.in_(driver_ids),
+                User.university_key == current_user.university_key,
+                User.role == UserRole.driver,
+            )
+        )
+        valid_drivers = set(result.scalars().all())
+
+    errors: Dict[int, str] = {}
+    item_indexes: Dict[int, int] = {}  # ride_id -> item index
+    groups: Dict[tuple, List[int]] = {}  # (status, driver_id) -> ride ids
+    for index, item in enumerate(payload.items):
+        if item.ride_id in item_indexes:
+            errors[index] = "Ride appears more than once in this batch"
+            continue
+        if item.action == "accept" and item.driver_id not in valid_drivers:
+            errors[index] = "No driver with this id at your university"
+            continue
+        item_indexes[item.ride_id] = index
+        if item.action == "accept":
+            groups.setdefault((RideStatus.accepted, item.driver_id), []).append(item.ride_id)
+        else:
+            groups.setdefault((RideStatus.declined, None), []).append(item.ride_id)
+
+    updated = set()
+    for (new_status, driver_id), ride_ids in groups.items():
+        values = {"status": new_status}
+        if driver_id is not None:
+            values["driver_id"] = driver_id
+        result = await db.execute(
+            update(RideRequest)
+            .where(
+                RideRequest.id.in_(ride_ids),
+                RideRequest.university_key == current_user.university_key,
+                RideRequest.status == RideStatus.pending,
+            )
+            .values(**values)
+            .returning(RideRequest.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated.update(result.scalars().all())
+    await db.commit()
+
+    rides = await _load_rides(db, list(item_indexes))
+    for ride_id, index in item_indexes.items():
+        if ride_id in updated:
+            continue
+        ride = rides.get(ride_id)
+        if ride is None:
+            errors[index] = "Ride request not found"
+        elif ride.university_key != current_user.university_key:
+            errors[index] = "Cannot respond to requests from other universities"
+        else:
+            errors[index] = "Request is no longer pending"
+    record_ride_changes([rides[ride_id] for ride_id in updated], pending_changed=True)
+
+    return _bulk_result(
+        [
+            schemas.BulkItemResult(index=index, ok=True, ride=rides[item.ride_id])
+            if index not in errors
+            else schemas.BulkItemResult(index=index, ok=False, error=errors[index])
+            for index, item in enumerate(payload.items)
+        ]
+    )
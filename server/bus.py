@@ -0,0 +1,237 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import make_url
+
+from .config import settings
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], None]
+
+BACKENDS = ("auto", "local", "sqlite")
+
+
+class ChangeBus:
+    """Delivers cache invalidations and ride events to every worker process.
+
+    ``publish`` runs the handlers subscribed to ``kind`` in this process
+    straight away and hands the message to the backend for the other
+    workers. This base class is the in-process backend, enough for a single
+    worker. Handlers must be thread-safe and must not block: remote messages
+    are delivered on the backend's own thread.
+    """
+
+    def __init__(self):
+        self.origin = secrets.token_hex(8)
+        self.published = 0
+        self.received = 0
+        self.lag_seconds = 0.0  # summed over received messages
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, kind: str, handler: Handler) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def publish(self, kind: str, payload: Dict[str, Any]) -> None:
+        self.published += 1
+        self._dispatch(kind, payload)
+        self._send(kind, payload)
+
+    def start(self) -> None:
+        if _multiple_workers():
+            logger.warning(
+                "The local change bus only reaches this worker, but the server appears to run several: "
+                "event streams, ETags and pending queues will go stale across workers. "
+                "Set APP_CHANGE_BUS_BACKEND=sqlite."
+            )
+
+    def close(self, timeout: Optional[float] = 10) -> None:
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        return {"published": self.published, "received": self.received, "lag_seconds": self.lag_seconds}
+
+    def _send(self, kind: str, payload: Dict[str, Any]) -> None:
+        pass
+
+    def _dispatch(self, kind: str, payload: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(kind, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Change bus handler for %s failed", kind)
+
+
+class SQLiteChangeLogBus(ChangeBus):
+    """Change bus backed by a SQLite change log that every worker appends to and tails.
+
+    Needs no external service: the workers of one host share a WAL-mode
+    database file. A background thread writes queued messages in batches and
+    reads rows appended by other workers, waking at least every
+    ``poll_interval`` seconds, which bounds delivery latency. Rows older than
+    ``retention_seconds`` are pruned; AUTOINCREMENT keeps ids from being
+    reused so a tailing worker never skips or repeats a message.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        poll_interval: float = settings.change_bus_poll_seconds,
+        retention_seconds: float = settings.change_bus_retention_seconds,
+        batch_size: int = 500,
+    ):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[Tuple[str, str, float]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name="change-bus", daemon=True)
+            self._thread.start()
+        # Don't return until the tail position is known, so nothing published after start() is missed
+        self._ready.wait(5)
+
+    def close(self, timeout: Optional[float] = 10) -> None:
+        """Write everything still queued and stop the background thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def _send(self, kind: str, payload: Dict[str, Any]) -> None:
+        if self._thread is not None:
+            self._queue.put((kind, dumps(payload).decode("utf-8"), time.time()))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS change_log ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, kind TEXT NOT NULL, "
+            "payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    def _run(self) -> None:
+        try:
+            conn = self._connect()
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM change_log").fetchone()[0]
+        except sqlite3.Error:
+            logger.exception("Could not open change log at %s", self.path)
+            self._ready.set()
+            return
+        self._ready.set()
+        next_prune = 0.0
+        try:
+            while True:
+                batch, stop = self._next_batch()
+                try:
+                    if batch:
+                        with conn:
+                            conn.executemany(
+                                "INSERT INTO change_log (origin, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                                [(self.origin, kind, payload, created_at) for kind, payload, created_at in batch],
+                            )
+                    last_id = self._tail(conn, last_id)
+                    if time.monotonic() >= next_prune:
+                        next_prune = time.monotonic() + self.retention_seconds / 10
+                        with conn:
+                            conn.execute("DELETE FROM change_log WHERE created_at < ?", (time.time() - self.retention_seconds,))
+                except sqlite3.Error:
+                    logger.exception("Change log write or read failed")
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _next_batch(self):
+        # Wait up to one poll interval for the first message, then take whatever else is queued
+        batch: List[Tuple[str, str, float]] = []
+        try:
+            message = self._queue.get(timeout=self.poll_interval)
+        except queue.Empty:
+            return batch, False
+        while message is not None:
+            batch.append(message)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _tail(self, conn: sqlite3.Connection, last_id: int) -> int:
+        rows = conn.execute(
+            "SELECT id, origin, kind, payload, created_at FROM change_log WHERE id > ? ORDER BY id",
+            (last_id,),
+        ).fetchall()
+        now = time.time()
+        for row_id, origin, kind, payload, created_at in rows:
+            last_id = row_id
+            if origin == self.origin:
+                continue
+            self.received += 1
+            self.lag_seconds += max(0.0, now - created_at)
+            self._dispatch(kind, json.loads(payload))
+        return last_id
+
+
+def _multiple_workers() -> bool:
+    """Best-effort guess whether this process is one of several server workers."""
+    try:
+        if int(os.environ.get("WEB_CONCURRENCY", "1")) > 1:
+            return True
+    except ValueError:
+        pass
+    # uvicorn --workers spawns workers through multiprocessing; gunicorn forks its own
+    return multiprocessing.parent_process() is not None or "gunicorn" in sys.modules
+
+
+def _sqlite_file(database_url: str) -> Optional[Path]:
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return Path(url.database)
+
+
+def create_bus(backend: str = settings.change_bus_backend, database_url: str = settings.database_url) -> ChangeBus:
+    """Build the configured bus; "auto" shares a change log whenever the database is a SQLite file."""
+    if backend not in BACKENDS:
+        raise ValueError(f"change_bus_backend must be one of {BACKENDS}")
+    database_file = _sqlite_file(database_url)
+    if backend == "auto":
+        backend = "sqlite" if database_file is not None or settings.change_bus_path is not None else "local"
+    if backend == "local":
+        return ChangeBus()
+    path = settings.change_bus_path or (database_file or Path("quaddash")).with_suffix(".changes.db")
+    return SQLiteChangeLogBus(path)
+
+
+bus = create_bus()
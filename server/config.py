@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any, Dict
+from typing import List, Optional
 from pydantic import BaseSettings
 
 
@@ -10,38 +10,93 @@ class Settings(BaseSettings):
     jwt_secret: str = "change-me"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24  # 1 day by default
+    # Event-stream tokens travel in the URL (and so in access logs); they only open a stream and expire quickly
+    stream_token_expire_seconds: int = 60
+
+    # Hot-path caches for get_current_user; a size of 0 disables a cache
+    auth_token_cache_size: int = 10_000
+    auth_token_cache_ttl_seconds: int = 60 * 60
+    auth_user_cache_size: int = 10_000
+    auth_user_cache_ttl_seconds: int = 60
+
+    # Token-bucket throttling of /auth/login and /auth/register, checked before any hashing or DB work
+    auth_throttle_enabled: bool = True
+    # Generous per IP: a whole campus can sit behind one NAT address; the per-email buckets stop password guessing
+    auth_ip_burst: int = 120
+    auth_ip_per_minute: float = 60
+    auth_email_burst: int = 5
+    auth_email_per_minute: float = 2
+    auth_throttle_max_keys: int = 100_000
+    auth_throttle_sweep_seconds: float = 60
+
+    # bcrypt work factor; hashes made with a different cost are upgraded on login
+    bcrypt_rounds: int = 12
+    # Password hashing runs on its own pool so it cannot starve the request threadpool
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 16
 
     database_url: str = f"sqlite:///{(BASE_DIR / 'data.db').as_posix()}"
+    # "production" turns on WAL, tuned pragmas and pooling for file SQLite; "default" leaves SQLite's stock settings
+    sqlite_profile: str = "default"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_mmap_size_bytes: int = 256 * 1024 * 1024
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    # Schema bootstrap at startup: "auto" upgrades only when the models changed since the last stamped run,
+    # "always" upgrades on every start, "skip" trusts the schema (run `python -m server.migrations` on deploy)
+    schema_bootstrap: str = "auto"
+
+    event_stream_keepalive_seconds: int = 15
+    # The in-memory pending queue is rebuilt from the database this often to catch writes made elsewhere
+    pending_queue_reconcile_seconds: float = 60
+
+    # Cross-worker invalidation/event bus: "sqlite" (a change log shared by all workers), "local" (single worker only)
+    # or "auto", which picks sqlite whenever the database is a SQLite file
+    change_bus_backend: str = "auto"
+    change_bus_path: Optional[Path] = None  # defaults to <database>.changes.db next to a SQLite database
+    change_bus_poll_seconds: float = 0.05  # upper bound on how long another worker's change goes unseen
+    change_bus_retention_seconds: float = 300
+
+    # Users allowed to create and respond to rides in bulk for campus events
+    coordinator_emails: List[str] = []
+    bulk_max_items: int = 500
+
+    # Finished rides older than this move to per-month archive tables; 0 disables archival
+    archive_after_days: int = 180
+    archive_interval_seconds: float = 3600
+    archive_batch_size: int = 500  # rides moved per transaction
+    archive_batch_pause_seconds: float = 0.1  # lets queued writers in between batches
+    archive_catalog_refresh_seconds: float = 60  # how often to look for archive months created elsewhere
+
+    # Opt-in batch dispatch: a periodic job assigns pending rides to available drivers
+    dispatch_enabled: bool = False
+    dispatch_interval_seconds: float = 10
+    dispatch_horizon_minutes: int = 60  # only rides starting within this window are dispatched
+    dispatch_max_pickup_m: float = 10_000
+    dispatch_batch_size: int = 500
+
+    # Write list responses straight from rows with orjson instead of validating through pydantic
+    fast_json_responses: bool = False
+
+    # Adds app and DB timings to every response for browser devtools
+    server_timing_header: bool = False
 
     email_sender: str = "noreply@campusrides.local"
     email_outbox_path: Path = BASE_DIR / "outbox" / "emails.log"
+    email_outbox_max_bytes: int = 10 * 1024 * 1024  # rotate past this size; 0 disables rotation
+    email_outbox_backup_count: int = 5
+    email_outbox_fsync: str = "interval"  # "always", "interval" or "never"
+    email_outbox_fsync_interval_seconds: float = 1.0
+    email_outbox_batch_size: int = 100
+    email_outbox_flush_interval_seconds: float = 0.5
+    email_outbox_queue_size: int = 10_000
 
-    universities: Dict[str, Dict[str, Any]] = {
-        "grambling": {
-            "name": "Grambling State University",
-            "domains": ["gram.edu"],
-        },
-        "howard": {
-            "name": "Howard University",
-            "domains": ["howard.edu"],
-        },
-        "spelman": {
-            "name": "Spelman College",
-            "domains": ["spelman.edu"],
-        },
-        "morehouse": {
-            "name": "Morehouse College",
-            "domains": ["morehouse.edu"],
-        },
-        "famu": {
-            "name": "Florida A&M University",
-            "domains": ["famu.edu"],
-        },
-        "hampton": {
-            "name": "Hampton University",
-            "domains": ["hamptonu.edu"],
-        },
-    }
+    # University registry data file; edits are picked up without a restart
+    universities_path: Path = BASE_DIR / "data" / "universities.json"
+    universities_reload_seconds: float = 5  # how often to check the file for changes
+    universities_cache_max_age_seconds: int = 300
 
     class Config:
         env_prefix = "APP_"
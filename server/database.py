@@ -1,19 +1,109 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from .config import settings
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
-)
+
+def _sync_database_url(url: str) -> str:
+    # Hosting providers still hand out postgres:// URLs, which SQLAlchemy 2 no longer accepts
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching asyncio driver."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:") or url.startswith("postgresql+psycopg2:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+def _is_file_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and url.rstrip("/") not in ("sqlite:", "sqlite+aiosqlite:")
+
+
+def sqlite_pragmas(profile: str) -> List[str]:
+    """PRAGMA statements run on every new connection for the given SQLite profile."""
+    if profile != "production":
+        return []
+    return [
+        # Readers no longer block behind a writer's commit
+        "PRAGMA journal_mode=WAL",
+        # Safe with WAL: a power loss may drop the last commits but never corrupts the file
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_bytes}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def install_sqlite_pragmas(sync_engine: Engine, pragmas: List[str]) -> None:
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def _pool_options(url: str, profile: str, is_async: bool) -> Dict[str, Any]:
+    if url.startswith("sqlite") and (profile != "production" or not _is_file_sqlite(url)):
+        return {}
+    options: Dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+    if is_async and url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool, which opens a connection (and thread) per session
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+
+def build_engines(url: str, profile: str):
+    """Create the (sync, async) engine pair for ``url`` using the given SQLite profile."""
+    url = _sync_database_url(url)
+    sync_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+        **_pool_options(url, profile, is_async=False),
+    )
+    async_engine = create_async_engine(_async_database_url(url), **_pool_options(url, profile, is_async=True))
+    if url.startswith("sqlite"):
+        pragmas = sqlite_pragmas(profile)
+        install_sqlite_pragmas(sync_engine, pragmas)
+        install_sqlite_pragmas(async_engine.sync_engine, pragmas)
+    return sync_engine, async_engine
+
+
+# The sync engine is kept for schema management and scripts; requests use the async one
+engine, async_engine = build_engines(settings.database_url, settings.sqlite_profile)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Objects stay usable after commit; reloading them would need implicit IO, which async sessions forbid
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def dialect_insert(session):
+    """Return the ``insert`` construct for the session's backend, which supports ON CONFLICT."""
+    return postgresql_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from . import schemas
+from .auth import get_current_user
+from .config import settings
+from .database import AsyncSessionLocal, get_db
+from .geo import GridIndex, Point
+from .models import DriverAvailability, RideRequest, RideStatus, User, UserRole
+from .rides import record_ride_changes, rides_with_people
+from .universities import registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/dispatch", tags=["dispatch"])
+
+# (ride_id, ride_date, pickup point or None)
+PendingRide = Tuple[int, datetime, Optional[Point]]
+# (driver_id, available_since, position or None)
+AvailableDriver = Tuple[int, datetime, Optional[Point]]
+
+
+def plan_assignments(
+    rides: Sequence[PendingRide],
+    drivers: Sequence[AvailableDriver],
+    max_pickup_m: float = settings.dispatch_max_pickup_m,
+) -> List[Tuple[int, int]]:
+    """Greedily pair pending rides with free drivers, returning (ride_id, driver_id) pairs.
+
+    Rides are served soonest first. A ride with a pickup point gets the nearest
+    free driver within ``max_pickup_m``; otherwise, or if nobody with a known
+    position is close enough, it falls back to the longest-waiting driver whose
+    position is unknown (any free driver if the ride has no pickup point).
+    """
+    waiting = sorted(drivers, key=lambda driver: (driver[1], driver[0]))
+    free = OrderedDict((driver_id, point) for driver_id, _, point in waiting)
+    unlocated = OrderedDict((driver_id, None) for driver_id, _, point in waiting if point is None)
+    grid = GridIndex()
+    for driver_id, _, point in waiting:
+        if point is not None:
+            grid.add(driver_id, point)
+
+    assignments = []
+    for ride_id, _, pickup in sorted(rides, key=lambda ride: (ride[1], ride[0])):
+        if not free:
+            break
+        driver_id = None
+        if pickup is not None:
+            match = grid.nearest(pickup, max_pickup_m, 1)
+            if match:
+                driver_id = match[0][0]
+            elif unlocated:
+                driver_id = next(iter(unlocated))
+        else:
+            driver_id = next(iter(free))
+        if driver_id is None:
+            continue
+
+        assignments.append((ride_id, driver_id))
+        del free[driver_id]
+        unlocated.pop(driver_id, None)
+        grid.remove(driver_id)
+    return assignments
+
+
+async def run_dispatch(university_key: str) -> List[RideRequest]:
+    """Assign one batch of pending rides for a university in a single transaction.
+
+    Each assignment is a compare-and-set on the ride still being pending and
+    the driver still having no accepted ride, so rides accepted or cancelled
+    by hand in the meantime are simply skipped, and a driver is never handed
+    two rides even when several workers dispatch the same university at once.
+    Drivers stay available and are picked again once their ride is finished.
+    """
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        ride_rows = await db.execute(
+            select(RideRequest.id, RideRequest.ride_date, RideRequest.pickup_lat, RideRequest.pickup_lng)
+            .where(
+                RideRequest.university_key == university_key,
+                RideRequest.status == RideStatus.pending,
+                RideRequest.ride_date <= now + timedelta(minutes=settings.dispatch_horizon_minutes),
+            )
+            .order_by(RideRequest.ride_date, RideRequest.id)
+            .limit(settings.dispatch_batch_size)
+        )
+        rides = [(ride_id, ride_date, _point(lat, lng)) for ride_id, ride_date, lat, lng in ride_rows]
+        if not rides:
+            return []
+
+        busy = select(RideRequest.driver_id).where(
+            RideRequest.status == RideStatus.accepted,
+            RideRequest.driver_id.is_not(None),
+        )
+        driver_rows = await db.execute(
+            select(
+                DriverAvailability.driver_id,
+                DriverAvailability.available_since,
+                DriverAvailability.lat,
+                DriverAvailability.lng,
+            ).where(
+                DriverAvailability.university_key == university_key,
+                DriverAvailability.driver_id.not_in(busy),
+            )
+        )
+        drivers = [(driver_id, since, _point(lat, lng)) for driver_id, since, lat, lng in driver_rows]
+
+        other = aliased(RideRequest)
+        assigned = []
+        for ride_id, driver_id in plan_assignments(rides, drivers):
+            driver_busy = exists().where(other.driver_id == driver_id, other.status == RideStatus.accepted)
+            result = await db.execute(
+                update(RideRequest)
+                .where(RideRequest.id == ride_id, RideRequest.status == RideStatus.pending, ~driver_busy)
+                .values(status=RideStatus.accepted, driver_id=driver_id)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                assigned.append(ride_id)
+        await db.commit()
+        if not assigned:
+            return []
+
+        result = await db.execute(rides_with_people().where(RideRequest.id.in_(assigned)))
+        dispatched = result.scalars().all()
+
+    record_ride_changes(dispatched, pending_changed=True)
+    return dispatched
+
+
+def _point(lat: Optional[float], lng: Optional[float]) -> Optional[Point]:
+    return (lat, lng) if lat is not None else None
+
+
+async def dispatch_loop() -> None:
+    """Run a dispatch batch for every university each ``dispatch_interval_seconds``."""
+    while True:
+        for university_key in registry.keys():
+            try:
+                dispatched = await run_dispatch(university_key)
+            except Exception:
+                logger.exception("Dispatch failed for %s", university_key)
+                continue
+            if dispatched:
+                logger.info("Dispatched %d rides for %s", len(dispatched), university_key)
+        await asyncio.sleep(settings.dispatch_interval_seconds)
+
+
+def _require_dispatch_driver(current_user: User) -> None:
+    if current_user.role != UserRole.driver:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only drivers can set availability",
+        )
+    if not settings.dispatch_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dispatch is not enabled",
+        )
+
+
+@router.get("/availability", response_model=Optional[schemas.AvailabilityOut])
+async def get_availability(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get the current driver's dispatch availability, if any."""
+    return await db.get(DriverAvailability, current_user.id)
+
+
+@router.put("/availability", response_model=schemas.AvailabilityOut)
+async def set_availability(
+    payload: schemas.AvailabilityUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Mark the driver available for dispatch, optionally updating their position."""
+    _require_dispatch_driver(current_user)
+
+    availability = await db.get(DriverAvailability, current_user.id)
+    if availability is None:
+        availability = DriverAvailability(
+            driver_id=current_user.id,
+            university_key=current_user.university_key,
+            available_since=datetime.utcnow(),
+        )
+        db.add(availability)
+    availability.lat = payload.lat
+    availability.lng = payload.lng
+    await db.commit()
+    return availability
+
+
+@router.delete("/availability", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_availability(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Stop receiving dispatched rides."""
+    availability = await db.get(DriverAvailability, current_user.id)
+    if availability is not None:
+        await db.delete(availability)
+        await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from . import schemas
+from .auth import get_current_user
+from .database import dialect_insert, get_db
+from .models import DriverStats, User, UserRole
+
+router = APIRouter(prefix="/drivers", tags=["drivers"])
+
+
+async def record_rating(db: AsyncSession, driver_id: int, rating: int) -> None:
+    """Add one rating to a driver's totals as a single upsert in the caller's transaction.
+
+    The increments happen in SQL, so concurrent reviews for the same driver
+    cannot overwrite each other's counts.
+    """
+    insert = dialect_insert(db)
+    bucket = f"rating_{rating}"
+    statement = insert(DriverStats).values(driver_id=driver_id, rating_count=1, rating_sum=rating, **{bucket: 1})
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DriverStats.driver_id],
+            set_={
+                "rating_count": DriverStats.rating_count + 1,
+                "rating_sum": DriverStats.rating_sum + rating,
+                bucket: getattr(DriverStats, bucket) + 1,
+            },
+        )
+    )
+
+
+@router.get("/{driver_id}", response_model=schemas.DriverProfileOut)
+async def get_driver_profile(
+    driver_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get a driver's public profile and rating summary from the driver's university."""
+    result = await db.execute(
+        select(User).options(joinedload(User.driver_stats)).where(User.id == driver_id)
+    )
+    driver = result.scalars().first()
+    if not driver or driver.role != UserRole.driver or driver.university_key != current_user.university_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Driver not found",
+        )
+
+    stats = driver.driver_stats or DriverStats(
+        driver_id=driver.id,
+        rating_count=0,
+        rating_sum=0,
+        **{f"rating_{stars}": 0 for stars in range(1, 6)},
+    )
+    return schemas.DriverProfileOut(
+        id=driver.id,
+        full_name=driver.full_name,
+        university_key=driver.university_key,
+        license_plate=driver.license_plate,
+        driver_stats=schemas.DriverStatsOut.from_orm(stats),
+    )
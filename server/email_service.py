@@ -1,13 +1,156 @@
+import atexit
+import os
+import queue
+import threading
+import time
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from .config import settings
 
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class EmailOutbox:
+    """Process-wide outbox that appends queued messages to the log from a background thread.
+
+    Messages are written in batches, the log is rotated once it grows past
+    ``max_bytes``, and ``fsync_policy`` decides how often writes are forced to
+    disk: after every batch ("always"), at most every ``fsync_interval``
+    seconds ("interval"), or never.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = settings.email_outbox_max_bytes,
+        backup_count: int = settings.email_outbox_backup_count,
+        fsync_policy: str = settings.email_outbox_fsync,
+        fsync_interval: float = settings.email_outbox_fsync_interval_seconds,
+        batch_size: int = settings.email_outbox_batch_size,
+        flush_interval: float = settings.email_outbox_flush_interval_seconds,
+        queue_size: int = settings.email_outbox_queue_size,
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {FSYNC_POLICIES}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_fsync = 0.0
+
+    def enqueue(self, message: str) -> None:
+        """Queue a message; blocks only if the writer has fallen ``queue_size`` messages behind."""
+        self._ensure_started()
+        self._queue.put(message)
+
+    def close(self, timeout: Optional[float] = 10) -> None:
+        """Write everything still queued and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        f = self.path.open("a", encoding="utf-8")
+        try:
+            while True:
+                batch, stop = self._next_batch()
+                if batch:
+                    f = self._write(f, batch)
+                if stop:
+                    if self.fsync_policy != "never":
+                        os.fsync(f.fileno())
+                    return
+        finally:
+            f.close()
+
+    def _next_batch(self):
+        # Wait for the first message, then take whatever else is already queued
+        batch: List[str] = []
+        try:
+            message = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, False
+        while message is not None:
+            batch.append(message)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _write(self, f, batch: List[str]):
+        f.write("".join(batch))
+        f.flush()
+        now = time.monotonic()
+        if self.fsync_policy == "always" or (
+            self.fsync_policy == "interval" and now - self._last_fsync >= self.fsync_interval
+        ):
+            os.fsync(f.fileno())
+            self._last_fsync = now
+        if self.max_bytes and f.tell() >= self.max_bytes:
+            f.close()
+            self._rotate()
+            f = self.path.open("a", encoding="utf-8")
+        return f
+
+    def _rotate(self) -> None:
+        # emails.log -> emails.log.1 -> ... -> emails.log.<backup_count>, dropping the oldest
+        if self.backup_count <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+
+_outboxes: Dict[Path, EmailOutbox] = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox(path: Path = settings.email_outbox_path) -> EmailOutbox:
+    with _outboxes_lock:
+        if path not in _outboxes:
+            _outboxes[path] = EmailOutbox(path)
+        return _outboxes[path]
+
+
+@atexit.register
+def close_outboxes() -> None:
+    with _outboxes_lock:
+        outboxes = list(_outboxes.values())
+    for outbox in outboxes:
+        outbox.close()
+
 
 class EmailService:
     def __init__(self, outbox_path: Path = settings.email_outbox_path):
-        self.outbox_path = outbox_path
-        self.outbox_path.parent.mkdir(parents=True, exist_ok=True)
+        self.outbox = get_outbox(outbox_path)
 
     def send_verification_email(self, recipient: str, code: str, university_name: str) -> None:
         timestamp = datetime.utcnow().isoformat()
@@ -17,9 +160,9 @@ class EmailService:
             f"Subject: Verify your {university_name} ride account\n"
             f"Body: Your verification code is {code}. It expires in 30 minutes.\n\n"
         )
-        with self.outbox_path.open("a", encoding="utf-8") as f:
-            f.write(content)
+        self.outbox.enqueue(content)
 
 
+@lru_cache(maxsize=None)
 def get_email_service() -> EmailService:
-    return EmailService()
\ No newline at end of file
+    return EmailService()
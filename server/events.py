@@ -0,0 +1,74 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class EventBroker:
+    """In-process fan-out of ride events to connected event-stream clients.
+
+    Route handlers run either on the event loop or in the threadpool, so
+    publishing is thread-safe and hands each message to the subscriber's own
+    loop with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, channels: Iterable[str]) -> Tuple[asyncio.AbstractEventLoop, asyncio.Queue]:
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_queue_size))
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(entry)
+        return entry
+
+    def unsubscribe(self, channels: Iterable[str], entry: Tuple[asyncio.AbstractEventLoop, asyncio.Queue]) -> None:
+        with self._lock:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(entry)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel: str, event: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        message = (event, data)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put_nowait, queue, message)
+            except RuntimeError:
+                # The subscriber's loop has already shut down
+                continue
+
+
+def _put_nowait(queue: asyncio.Queue, message: Tuple[str, Dict[str, Any]]) -> None:
+    # Slow consumers lose the oldest notification rather than blocking writers;
+    # every event only tells the client to refetch, so dropping one is harmless.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def university_channel(university_key: str) -> str:
+    return f"university:{university_key}"
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+broker = EventBroker()
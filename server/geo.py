@@ -0,0 +1,154 @@
+import json
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .config import BASE_DIR
+
+EARTH_RADIUS_M = 6_371_000
+# ~550 m of latitude per cell: small enough that a campus spans many cells
+DEFAULT_CELL_DEGREES = 0.005
+
+Point = Tuple[float, float]
+
+
+def haversine_m(a: Point, b: Point) -> float:
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().replace("'", "").split())
+
+
+class LandmarkDirectory:
+    """Named campus points per university, loaded from ``data/landmarks.json``."""
+
+    def __init__(self, path=BASE_DIR / "data" / "landmarks.json"):
+        self._points: Dict[str, Dict[str, Point]] = {}
+        with open(path, encoding="utf-8") as f:
+            for university_key, landmarks in json.load(f).items():
+                points = self._points.setdefault(university_key, {})
+                for landmark in landmarks:
+                    point = (landmark["lat"], landmark["lng"])
+                    for name in [landmark["name"], *landmark.get("aliases", [])]:
+                        points[_normalize(name)] = point
+
+    def resolve(self, university_key: str, place: str) -> Optional[Point]:
+        return self._points.get(university_key, {}).get(_normalize(place))
+
+
+class GridIndex:
+    """Uniform lat/lng grid of points for one university.
+
+    Nearest-neighbour queries only visit cells in rings around the query
+    point, stopping once the ring is farther away than the radius or the
+    current k-th best match, so cost tracks local density rather than the
+    total number of points.
+    """
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], Dict[int, Point]] = {}
+        self._locations: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def _cell(self, point: Point) -> Tuple[int, int]:
+        return (math.floor(point[0] / self.cell_degrees), math.floor(point[1] / self.cell_degrees))
+
+    def add(self, item_id: int, point: Point) -> None:
+        self.remove(item_id)
+        cell = self._cell(point)
+        self._cells.setdefault(cell, {})[item_id] = point
+        self._locations[item_id] = cell
+
+    def remove(self, item_id: int) -> None:
+        cell = self._locations.pop(item_id, None)
+        if cell is None:
+            return
+        members = self._cells[cell]
+        members.pop(item_id, None)
+        if not members:
+            del self._cells[cell]
+
+    def nearest(self, point: Point, radius_m: float, limit: int) -> List[Tuple[int, float]]:
+        """Return up to ``limit`` (item_id, distance_m) pairs within ``radius_m``, nearest first."""
+        if not self._cells:
+            return []
+        center = self._cell(point)
+        # Smallest ground distance covered by one cell step (longitude cells shrink toward the poles)
+        cell_m = self.cell_degrees * math.pi / 180 * EARTH_RADIUS_M
+        cell_m *= max(math.cos(math.radians(min(abs(point[0]) + self.cell_degrees, 90))), 1e-6)
+        max_ring = int(radius_m / cell_m) + 1
+
+        found: List[Tuple[float, int]] = []
+        for ring in range(max_ring + 1):
+            # Anything in this ring is at least (ring - 1) cells away
+            if len(found) >= limit and (ring - 1) * cell_m > found[limit - 1][0]:
+                break
+            for cell in self._ring(center, ring):
+                for item_id, item_point in self._cells.get(cell, {}).items():
+                    distance = haversine_m(point, item_point)
+                    if distance <= radius_m:
+                        found.append((distance, item_id))
+            found.sort()
+        return [(item_id, distance) for distance, item_id in found[:limit]]
+
+    @staticmethod
+    def _ring(center: Tuple[int, int], ring: int):
+        cx, cy = center
+        if ring == 0:
+            yield center
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
+
+
+class PendingPickupIndex:
+    """Per-university grid indexes of pending rides that have pickup coordinates."""
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._lock = threading.Lock()
+        self._grids: Dict[str, GridIndex] = {}
+        self._universities: Dict[int, str] = {}
+
+    def add(self, ride_id: int, university_key: str, point: Point) -> None:
+        with self._lock:
+            self._remove(ride_id)
+            self._grids.setdefault(university_key, GridIndex(self.cell_degrees)).add(ride_id, point)
+            self._universities[ride_id] = university_key
+
+    def remove(self, ride_id: int) -> None:
+        with self._lock:
+            self._remove(ride_id)
+
+    def _remove(self, ride_id: int) -> None:
+        university_key = self._universities.pop(ride_id, None)
+        if university_key is not None:
+            self._grids[university_key].remove(ride_id)
+
+    def replace_all(self, rides: List[Tuple[int, str, Point]]) -> None:
+        with self._lock:
+            self._grids = {}
+            self._universities = {}
+            for ride_id, university_key, point in rides:
+                self._grids.setdefault(university_key, GridIndex(self.cell_degrees)).add(ride_id, point)
+                self._universities[ride_id] = university_key
+
+    def nearest(self, university_key: str, point: Point, radius_m: float, limit: int) -> List[Tuple[int, float]]:
+        with self._lock:
+            grid = self._grids.get(university_key)
+            return grid.nearest(point, radius_m, limit) if grid else []
+
+
+landmarks = LandmarkDirectory()
+pending_pickups = PendingPickupIndex()
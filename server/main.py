@@ -1,10 +1,54 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
 
-from . import auth, rides
-from .database import Base, engine
+# Taken before the framework imports so the startup report includes them
+_import_started = time.perf_counter()
 
-app = FastAPI(title="Campus Ride Backend", version="0.1.0")
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.responses import PlainTextResponse  # noqa: E402
+
+from . import archive, auth, bulk, dispatch, drivers, rides  # noqa: E402
+from .auth_cache import cache_stats  # noqa: E402
+from .bus import bus  # noqa: E402
+from .config import settings  # noqa: E402
+from .database import async_engine, engine  # noqa: E402
+from .email_service import close_outboxes  # noqa: E402
+from .metrics import MetricsMiddleware, instrument_engine, metrics  # noqa: E402
+from .migrations import bootstrap_schema  # noqa: E402
+from .startup import startup_timer  # noqa: E402
+
+startup_timer.record_imports(_import_started)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_timer.phase("schema"):
+        bootstrap_schema(engine, settings.schema_bootstrap)
+    bus.start()
+    with startup_timer.phase("warm_pending_queue"):
+        await rides.reconcile_pending_queue()
+    tasks = []
+    if settings.pending_queue_reconcile_seconds > 0:
+        tasks.append(asyncio.create_task(rides.pending_queue_loop()))
+    if settings.dispatch_enabled:
+        tasks.append(asyncio.create_task(dispatch.dispatch_loop()))
+    if settings.archive_after_days > 0:
+        tasks.append(asyncio.create_task(archive.archive_loop()))
+    startup_timer.mark_ready()
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    close_outboxes()
+    bus.close()
+    # Pooled aiosqlite connections own worker threads that would otherwise keep the process alive
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Campus Ride Backend", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,12 +59,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-Base.metadata.create_all(bind=engine)
+app.add_middleware(MetricsMiddleware)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 
 app.include_router(auth.router)
+app.include_router(bulk.router)
 app.include_router(rides.router)
+app.include_router(dispatch.router)
+app.include_router(drivers.router)
 
 
 @app.get("/")
 def root():
-    return {"message": "Backend is running", "docs": "/docs"}
\ No newline at end of file
+    return {"message": "Backend is running", "docs": "/docs"}
+
+
+@app.get("/stats/auth-cache")
+def auth_cache_stats():
+    return cache_stats()
+
+
+@app.get("/stats/startup")
+def startup_stats():
+    return startup_timer.report()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,202 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .auth_cache import cache_stats
+from .bus import bus
+from .config import settings
+from .startup import startup_timer
+from .throttle import throttle_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram for one label set."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.queries: Dict[Tuple[str, str], Histogram] = {}
+        self.db_seconds: Dict[Tuple[str, str], float] = {}
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(stats.queries)
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + stats.db_seconds
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# HELP quaddash_http_requests_total Requests by route template and status.")
+            lines.append("# TYPE quaddash_http_requests_total counter")
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'quaddash_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            _render_histogram(
+                lines,
+                "quaddash_http_request_duration_seconds",
+                "Time until the response starts, by route template.",
+                self.latency,
+            )
+            _render_histogram(
+                lines,
+                "quaddash_http_request_db_queries",
+                "SQL statements executed per request, by route template.",
+                self.queries,
+            )
+
+            lines.append("# HELP quaddash_http_request_db_seconds_total Time spent executing SQL, by route template.")
+            lines.append("# TYPE quaddash_http_request_db_seconds_total counter")
+            for (method, route), seconds in sorted(self.db_seconds.items()):
+                lines.append(f'quaddash_http_request_db_seconds_total{{method="{method}",route="{route}"}} {seconds:.6f}')
+
+        for name, kind, help_text in (
+            ("hits", "counter", "Auth cache hits."),
+            ("misses", "counter", "Auth cache misses."),
+            ("evictions", "counter", "Auth cache entries evicted for size."),
+            ("size", "gauge", "Auth cache entries currently held."),
+        ):
+            metric = f"quaddash_auth_cache_{name}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for cache, stats in cache_stats().items():
+                lines.append(f'{metric}{{cache="{cache}"}} {stats[name]}')
+
+        lines.append("# HELP quaddash_auth_throttle_rejected_total Login/register attempts rejected with 429.")
+        lines.append("# TYPE quaddash_auth_throttle_rejected_total counter")
+        for bucket, stats in throttle_stats().items():
+            lines.append(f'quaddash_auth_throttle_rejected_total{{bucket="{bucket}"}} {stats["rejected"]}')
+
+        bus_stats = bus.stats()
+        lines.append("# HELP quaddash_change_bus_messages_total Change bus messages published by and received from other workers.")
+        lines.append("# TYPE quaddash_change_bus_messages_total counter")
+        lines.append(f'quaddash_change_bus_messages_total{{direction="published"}} {bus_stats["published"]}')
+        lines.append(f'quaddash_change_bus_messages_total{{direction="received"}} {bus_stats["received"]}')
+        lines.append("# HELP quaddash_change_bus_lag_seconds_total Summed delay between another worker publishing a message and this one applying it.")
+        lines.append("# TYPE quaddash_change_bus_lag_seconds_total counter")
+        lines.append(f"quaddash_change_bus_lag_seconds_total {bus_stats['lag_seconds']:.6f}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(lines: List[str], name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = f'method="{method}",route="{route}"'
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+metrics = Metrics()
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Count statements and DB time against the request currently being served."""
+
+    # The start time lives on the statement's execution context, which is discarded with it;
+    # after_cursor_execute never runs for a failed statement, so nothing may be left on the connection
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_request.get()
+        if stats is None:
+            return
+        stats.queries += 1
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            stats.db_seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and DB usage per route template.
+
+    Latency is measured until the response starts, so long-lived event streams
+    are counted by how quickly they were accepted rather than how long they stayed open.
+    """
+
+    def __init__(self, app, server_timing: bool = settings.server_timing_header):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                elapsed = time.perf_counter() - started
+                route = scope.get("route")
+                metrics.record(
+                    scope["method"],
+                    route.path if route is not None else "unmatched",
+                    message["status"],
+                    elapsed,
+                    stats,
+                )
+                startup_timer.record_first_request(elapsed)
+                if self.server_timing:
+                    header = (
+                        f'app;dur={elapsed * 1000:.1f}, '
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import List
+
+from collections import defaultdict
+
+from sqlalchemy import Column, DateTime, Integer, String, Table, delete, func, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from .database import Base
+from .models import DriverStats, RideRequest, Review
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_MODES = ("auto", "always", "skip")
+
+# One row recording the model fingerprint the schema was last upgraded to
+schema_stamp = Table(
+    "schema_stamp",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def ensure_columns(bind: Engine) -> None:
+    """Add nullable columns introduced after a table was first created."""
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                logger.warning("Cannot add NOT NULL column %s.%s automatically", table.name, column.name)
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+
+
+def ensure_indexes(bind: Engine) -> List[str]:
+    """Create indexes added to the models after their tables already existed.
+
+    ``create_all`` only creates indexes together with new tables, so existing
+    ``data.db`` files need this to pick up new ones. Returns the names of
+    unique indexes that could not be created because of duplicate rows.
+    """
+    skipped = []
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=bind, checkfirst=True)
+            except IntegrityError:
+                # Existing rows violate a new unique index; leave it out rather than fail startup
+                logger.warning(
+                    "Could not create unique index %s; resolve the duplicate rows and restart",
+                    index.name,
+                )
+                skipped.append(index.name)
+    return skipped
+
+
+def backfill_driver_stats(bind: Engine) -> None:
+    """Seed driver rating totals from reviews written before ``driver_stats`` existed."""
+    totals = defaultdict(lambda: {"rating_count": 0, "rating_sum": 0, **{f"rating_{stars}": 0 for stars in range(1, 6)}})
+    with bind.begin() as conn:
+        rows = conn.execute(
+            select(RideRequest.driver_id, Review.rating, func.count())
+            .join(Review, Review.ride_id == RideRequest.id)
+            .where(RideRequest.driver_id.is_not(None))
+            .group_by(RideRequest.driver_id, Review.rating)
+        )
+        for driver_id, rating, count in rows:
+            stats = totals[driver_id]
+            stats["rating_count"] += count
+            stats["rating_sum"] += rating * count
+            stats[f"rating_{rating}"] += count
+        if totals:
+            conn.execute(
+                DriverStats.__table__.insert(),
+                [{"driver_id": driver_id, **stats} for driver_id, stats in totals.items()],
+            )
+
+
+def upgrade_schema(bind: Engine) -> List[str]:
+    """Bring the schema up to the models; returns the unique indexes ``ensure_indexes`` had to skip."""
+    had_driver_stats = inspect(bind).has_table(DriverStats.__tablename__)
+    Base.metadata.create_all(bind=bind)
+    ensure_columns(bind)
+    skipped = ensure_indexes(bind)
+    if not had_driver_stats:
+        backfill_driver_stats(bind)
+    return skipped
+
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column and index the models define."""
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda table: table.name):
+        parts.append(table.name)
+        parts.extend(f"{column.name} {column.type!r} {column.nullable}" for column in table.columns)
+        parts.extend(
+            sorted(f"{index.name} {[column.name for column in index.columns]} {index.unique}" for index in table.indexes)
+        )
+    return hashlib.blake2s("\n".join(parts).encode(), digest_size=8).hexdigest()
+
+
+def _stamped_fingerprint(bind: Engine):
+    try:
+        with bind.connect() as conn:
+            return conn.execute(select(schema_stamp.c.fingerprint)).scalar()
+    except DBAPIError:
+        # No stamp table yet: a new database, or one created before stamping existed
+        return None
+
+
+def bootstrap_schema(bind: Engine, mode: str = "auto") -> bool:
+    """Create or upgrade the schema as ``mode`` says; returns whether an upgrade ran.
+
+    In "auto" mode an up-to-date database costs one SELECT instead of the
+    inspection queries ``upgrade_schema`` issues for every table and index.
+    The schema is only stamped once every index exists, so a unique index
+    skipped over duplicate rows is retried on each start until it is created.
+    """
+    if mode not in BOOTSTRAP_MODES:
+        raise ValueError(f"schema_bootstrap must be one of {BOOTSTRAP_MODES}")
+    if mode == "skip":
+        return False
+    fingerprint = schema_fingerprint()
+    if mode == "auto" and _stamped_fingerprint(bind) == fingerprint:
+        return False
+    skipped = upgrade_schema(bind)
+    with bind.begin() as conn:
+        conn.execute(delete(schema_stamp))
+        if not skipped:
+            conn.execute(schema_stamp.insert().values(id=1, fingerprint=fingerprint, applied_at=datetime.utcnow()))
+    if skipped:
+        logger.warning("Schema left unstamped until indexes %s can be created", ", ".join(skipped))
+    else:
+        logger.info("Schema upgraded to %s", fingerprint)
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    bootstrap_schema(engine, mode="always")
+    # Fail the deploy step while any index is still missing
+    sys.exit(0 if _stamped_fingerprint(engine) == schema_fingerprint() else 1)
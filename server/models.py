@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime, timedelta
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -37,6 +37,7 @@ class User(Base):
     verification_codes = relationship("VerificationCode", back_populates="user", cascade="all, delete-orphan")
     ride_requests_as_rider = relationship("RideRequest", foreign_keys="RideRequest.rider_id", back_populates="rider")
     ride_requests_as_driver = relationship("RideRequest", foreign_keys="RideRequest.driver_id", back_populates="driver")
+    driver_stats = relationship("DriverStats", uselist=False, cascade="all, delete-orphan")
 
 
 class VerificationCode(Base):
@@ -56,8 +57,26 @@ class VerificationCode(Base):
         return datetime.utcnow() + timedelta(minutes=minutes)
 
 
+ACTIVE_RIDE_CONDITION = text("status IN ('pending', 'accepted')")
+
+
 class RideRequest(Base):
     __tablename__ = "ride_requests"
+    __table_args__ = (
+        Index("ix_ride_requests_university_status_date", "university_key", "status", "ride_date"),
+        Index("ix_ride_requests_rider_status", "rider_id", "status"),
+        Index("ix_ride_requests_driver_status", "driver_id", "status"),
+        Index("ix_ride_requests_rider_date", "rider_id", "ride_date"),
+        Index("ix_ride_requests_driver_date", "driver_id", "ride_date"),
+        # A rider may only have one pending or accepted ride at a time
+        Index(
+            "uq_ride_requests_active_rider",
+            "rider_id",
+            unique=True,
+            sqlite_where=ACTIVE_RIDE_CONDITION,
+            postgresql_where=ACTIVE_RIDE_CONDITION,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     rider_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -67,6 +86,11 @@ class RideRequest(Base):
     pickup_location = Column(String, nullable=False)
     destination = Column(String, nullable=False)
     ride_date = Column(DateTime, nullable=False)
+    # Set when a coordinator created the ride in bulk on the rider's behalf
+    coordinator_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    # Resolved from the campus landmark table when the pickup names a known place
+    pickup_lat = Column(Float, nullable=True)
+    pickup_lng = Column(Float, nullable=True)
 
     status = Column(Enum(RideStatus), default=RideStatus.pending, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -77,6 +101,43 @@ class RideRequest(Base):
     review = relationship("Review", back_populates="ride", uselist=False, cascade="all, delete-orphan")
 
 
+class DriverAvailability(Base):
+    """Drivers who opted into batch dispatch, with their last reported position."""
+
+    __tablename__ = "driver_availability"
+
+    driver_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    university_key = Column(String, nullable=False, index=True)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    available_since = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DriverStats(Base):
+    """Running rating totals per driver, updated in the same transaction as each review."""
+
+    __tablename__ = "driver_stats"
+
+    driver_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    # Histogram of ratings, one counter per star value
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+
+    @property
+    def rating_average(self):
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+
+    @property
+    def rating_histogram(self):
+        return {stars: getattr(self, f"rating_{stars}") or 0 for stars in range(1, 6)}
+
+
 class Review(Base):
     __tablename__ = "reviews"
 
@@ -0,0 +1,18 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(ride_date: datetime, ride_id: int) -> str:
+    raw = f"{ride_date.isoformat()}|{ride_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from ``encode_cursor``; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ride_date, ride_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(ride_date), int(ride_id)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -0,0 +1,134 @@
+import threading
+from bisect import bisect_right, insort
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .geo import PendingPickupIndex, pending_pickups
+from .models import RideRequest
+from .serialization import ride_to_dict
+
+Key = Tuple[datetime, int]
+Snapshot = Dict[str, Any]
+
+
+def ride_key(ride_date: datetime, ride_id: int) -> Key:
+    # Rows come back from SQLite naive; a freshly created ride may still carry the client's offset
+    if ride_date.tzinfo is not None:
+        ride_date = ride_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return ride_date, ride_id
+
+
+class PendingQueue:
+    """Write-through copy of every university's pending rides, ordered like the SQL query.
+
+    Entries are ``RideRequestOut``-shaped dicts from ``ride_to_dict`` so the
+    pending list can be served without touching the database. The pickup
+    proximity index is kept in step with the queue. ``ready`` stays False
+    until the first load, and callers fall back to SQL until then.
+    """
+
+    def __init__(self, pickups: PendingPickupIndex):
+        self.ready = False
+        self._pickups = pickups
+        self._lock = threading.Lock()
+        self._keys: Dict[str, List[Key]] = {}
+        self._entries: Dict[int, Tuple[str, Key, Snapshot]] = {}
+        # Ride ids written through while a reconcile is reading the database
+        self._touched: Optional[Set[int]] = None
+
+    def upsert_snapshot(self, university_key: str, snapshot: Snapshot) -> None:
+        """Add or refresh a pending ride from a ``ride_to_dict`` snapshot."""
+        with self._lock:
+            self._remove(snapshot["id"])
+            self._insert(university_key, snapshot)
+            if self._touched is not None:
+                self._touched.add(snapshot["id"])
+
+    def remove(self, ride_id: int) -> None:
+        with self._lock:
+            self._remove(ride_id)
+            if self._touched is not None:
+                self._touched.add(ride_id)
+
+    def page(self, university_key: str, after: Optional[Key], limit: int) -> Tuple[List[Snapshot], Optional[Key]]:
+        """Return up to ``limit`` rides after the ``after`` key, plus the key to continue from."""
+        with self._lock:
+            keys = self._keys.get(university_key, [])
+            start = bisect_right(keys, ride_key(*after)) if after is not None else 0
+            page_keys = keys[start:start + limit]
+            rides = [self._entries[ride_id][2] for _, ride_id in page_keys]
+            has_more = start + limit < len(keys)
+        return rides, (page_keys[-1] if has_more else None)
+
+    def get_many(self, ride_ids: Iterable[int]) -> Dict[int, Snapshot]:
+        with self._lock:
+            return {ride_id: self._entries[ride_id][2] for ride_id in ride_ids if ride_id in self._entries}
+
+    def begin_reconcile(self) -> None:
+        """Start tracking write-through changes; call before reading the database."""
+        with self._lock:
+            self._touched = set()
+
+    def finish_reconcile(self, rides: List[RideRequest]) -> Set[str]:
+        """Replace the queue with ``rides`` read since ``begin_reconcile``.
+
+        Rides written through in the meantime keep their live state, since the
+        database read may predate them. Returns the universities whose pending
+        list differed from the database.
+        """
+        snapshots = {ride.id: (ride.university_key, ride_to_dict(ride)) for ride in rides}
+        with self._lock:
+            touched = self._touched or set()
+            self._touched = None
+            for ride_id in touched:
+                live = self._entries.get(ride_id)
+                if live is None:
+                    snapshots.pop(ride_id, None)
+                else:
+                    snapshots[ride_id] = (live[0], live[2])
+
+            changed = {
+                university_key
+                for ride_id, (university_key, snapshot) in snapshots.items()
+                if ride_id not in self._entries or self._entries[ride_id][2] != snapshot
+            }
+            changed.update(
+                university_key for ride_id, (university_key, _, _) in self._entries.items() if ride_id not in snapshots
+            )
+
+            self._keys = {}
+            self._entries = {}
+            for university_key, snapshot in snapshots.values():
+                key = ride_key(snapshot["ride_date"], snapshot["id"])
+                self._keys.setdefault(university_key, []).append(key)
+                self._entries[snapshot["id"]] = (university_key, key, snapshot)
+            for keys in self._keys.values():
+                keys.sort()
+            self._pickups.replace_all(
+                [
+                    (snapshot["id"], university_key, (snapshot["pickup_lat"], snapshot["pickup_lng"]))
+                    for university_key, snapshot in snapshots.values()
+                    if snapshot["pickup_lat"] is not None
+                ]
+            )
+            self.ready = True
+        return changed
+
+    def _insert(self, university_key: str, snapshot: Snapshot) -> None:
+        key = ride_key(snapshot["ride_date"], snapshot["id"])
+        insort(self._keys.setdefault(university_key, []), key)
+        self._entries[snapshot["id"]] = (university_key, key, snapshot)
+        if snapshot["pickup_lat"] is not None:
+            self._pickups.add(snapshot["id"], university_key, (snapshot["pickup_lat"], snapshot["pickup_lng"]))
+
+    def _remove(self, ride_id: int) -> None:
+        entry = self._entries.pop(ride_id, None)
+        if entry is None:
+            return
+        university_key, key, _ = entry
+        keys = self._keys[university_key]
+        del keys[bisect_right(keys, key) - 1]
+        self._pickups.remove(ride_id)
+
+
+pending_queue = PendingQueue(pending_pickups)
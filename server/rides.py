@@ -1,20 +1,322 @@
-from typing import Optional
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from . import schemas
-from .auth import get_current_user
-from .database import get_db
+from .archive import FINISHED_STATUSES, find_archived_review, find_archived_ride, finished_rides_entity
+from .auth import get_current_user, get_stream_user
+from .bus import bus
+from .config import settings
+from .database import AsyncSessionLocal, get_db
+from .drivers import record_rating
+from .events import broker, format_sse, university_channel, user_channel
+from .geo import landmarks, pending_pickups
 from .models import RideRequest, RideStatus, User, UserRole, Review
+from .pagination import decode_cursor, encode_cursor
+from .pending_queue import pending_queue
+from .security import create_stream_token
+from .serialization import FastJSONResponse, ride_to_dict
+from .versions import etag_matches, make_etag, pending_scope, ratings_scope, ride_versions, user_scope
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/rides", tags=["rides"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_NEAR_RADIUS_M = 2_000
+MAX_NEAR_RADIUS_M = 50_000
+
+
+def rides_with_people(entity=RideRequest):
+    """Ride select that joins rider, driver and driver stats so serializing RideRequestOut issues no lazy loads."""
+    return select(entity).options(
+        joinedload(entity.rider, innerjoin=True),
+        joinedload(entity.driver).joinedload(User.driver_stats),
+    )
+
+
+async def _get_review(db: AsyncSession, ride_id: int) -> Optional[Review]:
+    result = await db.execute(
+        select(Review).options(joinedload(Review.reviewer)).where(Review.ride_id == ride_id)
+    )
+    return result.scalars().first()
+
+
+def _attach(obj, **related) -> None:
+    """Fill relationships of a row returned by INSERT ... RETURNING with users already in hand, skipping the reload."""
+    for key, value in related.items():
+        set_committed_value(obj, key, value)
+
+
+async def _get_ride(db: AsyncSession, ride_id: int) -> Optional[RideRequest]:
+    result = await db.execute(rides_with_people().where(RideRequest.id == ride_id))
+    return result.scalars().first()
+
+
+def record_ride_change(ride: RideRequest, pending_changed: bool) -> None:
+    """Bump list versions and notify event-stream clients, in every worker, after a ride changes state.
+
+    Must run after the commit so a reader never pairs a new ETag with old rows.
+    """
+    bus.publish("ride_changed", _ride_change(ride, pending_changed))
+
+
+def record_ride_changes(rides: List[RideRequest], pending_changed: bool) -> None:
+    """Like record_ride_change for a batch, sent as one bus message.
+
+    Clients hear about the batch once per user and once per university
+    rather than once per ride, so a bulk call or dispatch run does not make
+    every connected driver refetch hundreds of times.
+    """
+    if rides:
+        bus.publish("rides_changed", {"changes": [_ride_change(ride, pending_changed) for ride in rides]})
+
+
+def _ride_change(ride: RideRequest, pending_changed: bool) -> dict:
+    return {
+        "ride_id": ride.id,
+        "status": ride.status.value,
+        "rider_id": ride.rider_id,
+        "driver_id": ride.driver_id,
+        "university_key": ride.university_key,
+        "pending_changed": pending_changed,
+        # Pending rides carry their list entry so other workers can update their queues without a query
+        "snapshot": ride_to_dict(ride) if pending_changed and ride.status == RideStatus.pending else None,
+    }
+
+
+def _apply_ride_changes(changes: List[dict]) -> None:
+    scopes = set()
+    users = {}  # user id -> event data of their last changed ride
+    universities = {}  # university key -> event data of its last pending change
+    for change in changes:
+        data = {"ride_id": change["ride_id"], "status": change["status"]}
+        scopes.add(user_scope(change["rider_id"]))
+        users[change["rider_id"]] = data
+        if change["driver_id"]:
+            scopes.add(user_scope(change["driver_id"]))
+            users[change["driver_id"]] = data
+        if change["pending_changed"]:
+            snapshot = change["snapshot"]
+            if snapshot is None:
+                pending_queue.remove(change["ride_id"])
+            else:
+                if isinstance(snapshot["ride_date"], str):
+                    # Arrived from another worker as JSON
+                    snapshot = dict(
+                        snapshot,
+                        ride_date=datetime.fromisoformat(snapshot["ride_date"]),
+                        created_at=datetime.fromisoformat(snapshot["created_at"]),
+                    )
+                pending_queue.upsert_snapshot(change["university_key"], snapshot)
+            scopes.add(pending_scope(change["university_key"]))
+            universities[change["university_key"]] = data
+
+    for scope in scopes:
+        ride_versions.bump(scope)
+    for user_id, data in users.items():
+        broker.publish(user_channel(user_id), "ride_updated", data)
+    for university_key, data in universities.items():
+        broker.publish(university_channel(university_key), "pending_changed", data)
+
+
+bus.subscribe("ride_changed", lambda change: _apply_ride_changes([change]))
+bus.subscribe("rides_changed", lambda batch: _apply_ride_changes(batch["changes"]))
+bus.subscribe("ratings_changed", lambda change: ride_versions.bump(ratings_scope(change["university_key"])))
+
+
+async def _compare_and_set(db: AsyncSession, ride_id: int, conditions: list, values: dict) -> Optional[RideRequest]:
+    """Atomically update a ride only if it still matches ``conditions``.
+
+    Returns the updated ride (columns only, via RETURNING) or None, so
+    concurrent writers racing on the same ride get exactly one winner instead
+    of last-write-wins.
+    """
+    result = await db.execute(
+        update(RideRequest)
+        .where(RideRequest.id == ride_id, *conditions)
+        .values(**values)
+        .returning(RideRequest)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    ride = result.scalars().first()
+    await db.commit()
+    return ride
+
+
+def _list_response(response: Response, rides: list, next_cursor: Optional[str] = None):
+    """Build a RideRequestListResponse from ORM rides or ``ride_to_dict`` dicts.
+
+    With ``fast_json_responses`` the JSON is written straight from the rows,
+    skipping pydantic validation; headers already set on ``response`` are kept.
+    """
+    if settings.fast_json_responses:
+        content = {
+            "rides": [ride if isinstance(ride, dict) else ride_to_dict(ride) for ride in rides],
+            "next_cursor": next_cursor,
+        }
+        return FastJSONResponse(content, headers=dict(response.headers))
+    return schemas.RideRequestListResponse(rides=rides, next_cursor=next_cursor)
+
+
+async def _paginate(
+    db: AsyncSession,
+    response: Response,
+    query,
+    cursor: Optional[str],
+    limit: int,
+    newest_first: bool = False,
+    entity=RideRequest,
+):
+    """Return one keyset page of ``query`` ordered by (ride_date, id)."""
+    key = tuple_(entity.ride_date, entity.id)
+    if cursor:
+        after = tuple_(*_decode_cursor(cursor))
+        query = query.where(key < after if newest_first else key > after)
+
+    if newest_first:
+        query = query.order_by(entity.ride_date.desc(), entity.id.desc())
+    else:
+        query = query.order_by(entity.ride_date.asc(), entity.id.asc())
+
+    # Fetch one extra row to learn whether another page exists
+    rides = (await db.execute(query.limit(limit + 1))).scalars().all()
+    next_cursor = None
+    if len(rides) > limit:
+        rides = rides[:limit]
+        next_cursor = encode_cursor(rides[-1].ride_date, rides[-1].id)
+
+    return _list_response(response, rides, next_cursor)
+
+
+def _decode_cursor(cursor: str):
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def _not_modified(
+    request: Request, response: Response, scope: str, university_key: Optional[str] = None
+) -> Optional[Response]:
+    """Return a 304 response if the client already holds the current version of ``scope``.
+
+    Lists that show drivers pass their ``university_key``: a review changes a
+    driver's rating without touching any ride, so the university's ratings
+    version is part of the tag too. Versions are read before any query runs,
+    so a concurrent write can only make the tag older than the data, never newer.
+    """
+    version = ride_versions.get(scope)
+    if university_key is not None:
+        version = f"{version}.{ride_versions.get(ratings_scope(university_key))}"
+    etag = make_etag(scope, version, variant=request.url.query)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _parse_point(value: str):
+    try:
+        lat, lng = (float(part) for part in value.split(","))
+    except ValueError:
+        lat = lng = None
+    if lat is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="near must be given as lat,lng",
+        )
+    return lat, lng
+
+
+async def reconcile_pending_queue() -> None:
+    """Rebuild the in-memory pending queue (and pickup index) from the database.
+
+    Runs at startup to warm the queue and then periodically, so rides changed
+    outside this process's write-through path are eventually picked up.
+    """
+    pending_queue.begin_reconcile()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(rides_with_people().where(RideRequest.status == RideStatus.pending))
+        rides = result.scalars().all()
+    for university_key in pending_queue.finish_reconcile(rides):
+        ride_versions.bump(pending_scope(university_key))
+
+
+async def pending_queue_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.pending_queue_reconcile_seconds)
+        try:
+            await reconcile_pending_queue()
+        except Exception:
+            logger.exception("Pending queue reconcile failed")
+
+
+async def _event_stream(request: Request, channels: List[str]):
+    entry = broker.subscribe(channels)
+    _, queue = entry
+    try:
+        yield format_sse("ready", {"channels": channels})
+        while not await request.is_disconnected():
+            try:
+                event, data = await asyncio.wait_for(
+                    queue.get(), timeout=settings.event_stream_keepalive_seconds
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event, data)
+    finally:
+        broker.unsubscribe(channels, entry)
+
+
+@router.post("/events/token", response_model=schemas.TokenResponse)
+async def create_events_token(current_user: User = Depends(get_current_user)):
+    """Issue a short-lived token for opening ``/rides/events``.
+
+    EventSource can only authenticate through the URL, so the stream takes
+    this token instead of the regular access token.
+    """
+    return schemas.TokenResponse(access_token=create_stream_token(str(current_user.id)))
+
+
+@router.get("/events")
+async def ride_events(request: Request, current_user: User = Depends(get_stream_user)):
+    """Server-sent events telling the client when to refetch its rides.
+
+    Riders receive ``ride_updated`` for their own rides. Drivers also receive
+    ``pending_changed`` whenever their university's pending queue changes.
+    """
+    channels = [user_channel(current_user.id)]
+    if current_user.role == UserRole.driver:
+        channels.append(university_channel(current_user.university_key))
+
+    return StreamingResponse(
+        _event_stream(request, channels),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.post("/", response_model=schemas.RideRequestOut, status_code=status.HTTP_201_CREATED)
-def create_ride_request(
+async def create_ride_request(
     payload: schemas.RideRequestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new ride request. Only riders can create requests."""
@@ -24,39 +326,46 @@ def create_ride_request(
             detail="Only riders can create ride requests",
         )
 
-    # Check for existing active request (pending or accepted)
-    existing = (
-        db.query(RideRequest)
-        .filter(
-            RideRequest.rider_id == current_user.id,
-            RideRequest.status.in_([RideStatus.pending, RideStatus.accepted]),
+    pickup_point = None
+    if payload.pickup_lat is not None:
+        pickup_point = (payload.pickup_lat, payload.pickup_lng)
+    else:
+        pickup_point = landmarks.resolve(current_user.university_key, payload.pickup_location)
+
+    # The unique index on active rides rejects a second pending/accepted request.
+    # RETURNING hands back the row as stored, so building the response takes no second query.
+    try:
+        result = await db.execute(
+            insert(RideRequest)
+            .values(
+                rider_id=current_user.id,
+                university_key=current_user.university_key,
+                pickup_location=payload.pickup_location,
+                destination=payload.destination,
+                ride_date=payload.ride_date,
+                pickup_lat=pickup_point[0] if pickup_point else None,
+                pickup_lng=pickup_point[1] if pickup_point else None,
+            )
+            .returning(RideRequest)
         )
-        .first()
-    )
-
-    if existing:
+        ride = result.scalars().one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You already have an active ride request",
         )
-
-    # Create ride request
-    ride = RideRequest(
-        rider_id=current_user.id,
-        university_key=current_user.university_key,
-        pickup_location=payload.pickup_location,
-        destination=payload.destination,
-        ride_date=payload.ride_date,
-    )
-    db.add(ride)
-    db.commit()
-    db.refresh(ride)
+    _attach(ride, rider=current_user, driver=None)
+    record_ride_change(ride, pending_changed=True)
     return ride
 
 
 @router.get("/my-request", response_model=Optional[schemas.RideRequestOut])
-def get_my_request(
-    db: Session = Depends(get_db),
+async def get_my_request(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get the rider's current active request (pending or accepted)."""
@@ -66,48 +375,90 @@ def get_my_request(
             detail="Only riders can view their requests",
         )
 
-    ride = (
-        db.query(RideRequest)
-        .filter(
+    not_modified = _not_modified(request, response, user_scope(current_user.id), current_user.university_key)
+    if not_modified:
+        return not_modified
+
+    result = await db.execute(
+        rides_with_people()
+        .where(
             RideRequest.rider_id == current_user.id,
             RideRequest.status.in_([RideStatus.pending, RideStatus.accepted]),
         )
-        .first()
+        .limit(1)
     )
+    ride = result.scalars().first()
 
     return ride  # Returns null if no active request
 
 
 @router.get("/pending", response_model=schemas.RideRequestListResponse)
-def get_pending_requests(
-    db: Session = Depends(get_db),
+async def get_pending_requests(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    near: Optional[str] = Query(None, description="lat,lng to rank pickups by distance"),
+    radius: float = Query(DEFAULT_NEAR_RADIUS_M, gt=0, le=MAX_NEAR_RADIUS_M, description="meters"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get pending ride requests for the driver's university."""
+    """Get pending ride requests for the driver's university.
+
+    With ``near``, returns the ``limit`` closest pickups within ``radius``
+    meters, nearest first; rides without known coordinates are left out.
+    """
     if current_user.role != UserRole.driver:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only drivers can view pending requests",
         )
 
-    rides = (
-        db.query(RideRequest)
-        .filter(
-            RideRequest.university_key == current_user.university_key,
-            RideRequest.status == RideStatus.pending,
+    not_modified = _not_modified(request, response, pending_scope(current_user.university_key))
+    if not_modified:
+        return not_modified
+
+    if near is not None:
+        return await _nearest_pending(db, response, current_user.university_key, _parse_point(near), radius, limit)
+
+    if pending_queue.ready:
+        rides, next_key = pending_queue.page(
+            current_user.university_key, _decode_cursor(cursor) if cursor else None, limit
         )
-        .order_by(RideRequest.ride_date.asc())
-        .all()
+        return _list_response(response, rides, encode_cursor(*next_key) if next_key else None)
+
+    query = rides_with_people().where(
+        RideRequest.university_key == current_user.university_key,
+        RideRequest.status == RideStatus.pending,
     )
+    return await _paginate(db, response, query, cursor, limit)
 
-    return schemas.RideRequestListResponse(rides=rides)
+
+async def _nearest_pending(db: AsyncSession, response: Response, university_key: str, point, radius_m: float, limit: int):
+    nearest = pending_pickups.nearest(university_key, point, radius_m, limit)
+    if not nearest:
+        return _list_response(response, [])
+
+    distances = dict(nearest)
+    if pending_queue.ready:
+        rides = list(pending_queue.get_many(distances).values())
+    else:
+        result = await db.execute(
+            rides_with_people().where(
+                RideRequest.id.in_(distances),
+                RideRequest.status == RideStatus.pending,
+            )
+        )
+        rides = [ride_to_dict(ride) for ride in result.scalars().all()]
+    rides.sort(key=lambda ride: distances[ride["id"]])
+    return _list_response(response, [dict(ride, distance_m=round(distances[ride["id"]], 1)) for ride in rides])
 
 
 @router.post("/{ride_id}/respond", response_model=schemas.RideRequestOut)
-def respond_to_request(
+async def respond_to_request(
     ride_id: int,
     payload: schemas.RideRequestAction,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Accept or decline a ride request. Only drivers can respond."""
@@ -117,39 +468,52 @@ def respond_to_request(
             detail="Only drivers can respond to requests",
         )
 
-    ride = db.query(RideRequest).filter(RideRequest.id == ride_id).first()
-    if not ride:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ride request not found",
-        )
+    if payload.action == "accept":
+        values = {"status": RideStatus.accepted, "driver_id": current_user.id}
+    else:
+        values = {"status": RideStatus.declined}
 
-    if ride.university_key != current_user.university_key:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Cannot respond to requests from other universities",
-        )
+    updated = await _compare_and_set(
+        db,
+        ride_id,
+        [
+            RideRequest.university_key == current_user.university_key,
+            RideRequest.status == RideStatus.pending,
+        ],
+        values,
+    )
+    ride = await _get_ride(db, ride_id)
+
+    if not updated:
+        # Work out which condition failed to report the right error
+        if not ride:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ride request not found",
+            )
+
+        if ride.university_key != current_user.university_key:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Cannot respond to requests from other universities",
+            )
 
-    if ride.status != RideStatus.pending:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Request is no longer pending",
         )
 
-    if payload.action == "accept":
-        ride.status = RideStatus.accepted
-        ride.driver_id = current_user.id
-    else:
-        ride.status = RideStatus.declined
-
-    db.commit()
-    db.refresh(ride)
+    record_ride_change(ride, pending_changed=True)
     return ride
 
 
 @router.get("/my-accepted", response_model=schemas.RideRequestListResponse)
-def get_my_accepted_rides(
-    db: Session = Depends(get_db),
+async def get_my_accepted_rides(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get rides that this driver has accepted."""
@@ -159,23 +523,46 @@ def get_my_accepted_rides(
             detail="Only drivers can view accepted rides",
         )
 
-    rides = (
-        db.query(RideRequest)
-        .filter(
-            RideRequest.driver_id == current_user.id,
-            RideRequest.status == RideStatus.accepted,
-        )
-        .order_by(RideRequest.ride_date.asc())
-        .all()
+    not_modified = _not_modified(request, response, user_scope(current_user.id), current_user.university_key)
+    if not_modified:
+        return not_modified
+
+    query = rides_with_people().where(
+        RideRequest.driver_id == current_user.id,
+        RideRequest.status == RideStatus.accepted,
     )
+    return await _paginate(db, response, query, cursor, limit)
+
 
-    return schemas.RideRequestListResponse(rides=rides)
+@router.get("/history", response_model=schemas.RideRequestListResponse)
+async def get_ride_history(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get the user's completed, cancelled and declined rides, newest first, including archived ones."""
+    not_modified = _not_modified(request, response, user_scope(current_user.id), current_user.university_key)
+    if not_modified:
+        return not_modified
+
+    participant = "driver_id" if current_user.role == UserRole.driver else "rider_id"
+    entity = await finished_rides_entity(db, participant, current_user.id)
+    query = rides_with_people(entity)
+    if entity is RideRequest:
+        query = query.where(
+            getattr(RideRequest, participant) == current_user.id,
+            RideRequest.status.in_(FINISHED_STATUSES),
+        )
+    return await _paginate(db, response, query, cursor, limit, newest_first=True, entity=entity)
 
 
 @router.post("/{ride_id}/cancel", response_model=schemas.RideRequestOut)
-def cancel_ride_request(
+async def cancel_ride_request(
     ride_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Cancel a ride request. Only riders can cancel their own requests."""
@@ -185,35 +572,45 @@ def cancel_ride_request(
             detail="Only riders can cancel ride requests",
         )
 
-    ride = db.query(RideRequest).filter(RideRequest.id == ride_id).first()
-    if not ride:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ride request not found",
-        )
-
-    if ride.rider_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only cancel your own ride requests",
-        )
+    # Try pending first so we know whether the pending queue changed
+    values = {"status": RideStatus.cancelled}
+    owned = RideRequest.rider_id == current_user.id
+    ride = await _compare_and_set(db, ride_id, [owned, RideRequest.status == RideStatus.pending], values)
+    was_pending = ride is not None
+    if was_pending:
+        # A pending ride has no driver yet and its rider is the caller, so there is nothing to load
+        _attach(ride, rider=current_user, driver=None)
+        updated = True
+    else:
+        updated = await _compare_and_set(db, ride_id, [owned, RideRequest.status == RideStatus.accepted], values)
+        ride = await _get_ride(db, ride_id)
+
+    if not updated:
+        if not ride:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ride request not found",
+            )
+
+        if ride.rider_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only cancel your own ride requests",
+            )
 
-    if ride.status not in [RideStatus.pending, RideStatus.accepted]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Can only cancel pending or accepted rides",
         )
 
-    ride.status = RideStatus.cancelled
-    db.commit()
-    db.refresh(ride)
+    record_ride_change(ride, pending_changed=was_pending)
     return ride
 
 
 @router.post("/{ride_id}/complete", response_model=schemas.RideRequestOut)
-def complete_ride(
+async def complete_ride(
     ride_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Mark a ride as completed. Only drivers can complete rides."""
@@ -223,35 +620,43 @@ def complete_ride(
             detail="Only drivers can complete rides",
         )
 
-    ride = db.query(RideRequest).filter(RideRequest.id == ride_id).first()
-    if not ride:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ride request not found",
-        )
+    updated = await _compare_and_set(
+        db,
+        ride_id,
+        [
+            RideRequest.driver_id == current_user.id,
+            RideRequest.status == RideStatus.accepted,
+        ],
+        {"status": RideStatus.completed},
+    )
+    ride = await _get_ride(db, ride_id)
 
-    if ride.driver_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only complete rides you accepted",
-        )
+    if not updated:
+        if not ride:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ride request not found",
+            )
+
+        if ride.driver_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only complete rides you accepted",
+            )
 
-    if ride.status != RideStatus.accepted:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Can only complete accepted rides",
         )
 
-    ride.status = RideStatus.completed
-    db.commit()
-    db.refresh(ride)
+    record_ride_change(ride, pending_changed=False)
     return ride
 
 @router.post("/{ride_id}/review", response_model=schemas.ReviewOut)
-def submit_review(
+async def submit_review(
     ride_id: int,
     payload: schemas.ReviewCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Submit a review for a completed ride. Only riders can submit reviews."""
@@ -261,11 +666,22 @@ def submit_review(
             detail="Only riders can submit reviews",
         )
 
-    ride = db.query(RideRequest).filter(RideRequest.id == ride_id).first()
+    ride = await db.get(RideRequest, ride_id)
     if not ride:
+        archived = await find_archived_ride(db, ride_id)
+        if archived is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ride request not found",
+            )
+        if archived[1]["rider_id"] != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only review rides you took",
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ride request not found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This ride has been archived and can no longer be reviewed",
         )
 
     if ride.rider_id != current_user.id:
@@ -280,46 +696,59 @@ def submit_review(
             detail="Can only review completed rides",
         )
 
-    # Check if review already exists
-    existing_review = db.query(Review).filter(Review.ride_id == ride_id).first()
-    if existing_review:
+    # The unique ride_id on reviews turns a repeat (or concurrent) submission into an IntegrityError
+    # before the rating is counted, so there's no need to look for an existing review first
+    try:
+        result = await db.execute(
+            insert(Review)
+            .values(ride_id=ride_id, reviewer_id=current_user.id, rating=payload.rating, comment=payload.comment)
+            .returning(Review)
+        )
+        review = result.scalars().one()
+        if ride.driver_id:
+            await record_rating(db, ride.driver_id, payload.rating)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already reviewed this ride",
         )
-
-    review = Review(
-        ride_id=ride_id,
-        reviewer_id=current_user.id,
-        rating=payload.rating,
-        comment=payload.comment,
-    )
-    db.add(review)
-    db.commit()
-    db.refresh(review)
+    if ride.driver_id:
+        # The driver's rating shows on every ride they appear in
+        bus.publish("ratings_changed", {"university_key": ride.university_key})
+    _attach(review, reviewer=current_user)
     return review
 
 
 @router.get("/{ride_id}/review", response_model=Optional[schemas.ReviewOut])
-def get_ride_review(
+async def get_ride_review(
     ride_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get review for a ride if it exists."""
-    ride = db.query(RideRequest).filter(RideRequest.id == ride_id).first()
-    if not ride:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ride request not found",
-        )
+    """Get review for a ride if it exists, looking in the archive for old rides."""
+    archive_month = None
+    ride = await db.get(RideRequest, ride_id)
+    if ride:
+        rider_id, driver_id = ride.rider_id, ride.driver_id
+    else:
+        archived = await find_archived_ride(db, ride_id)
+        if archived is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ride request not found",
+            )
+        archive_month, row = archived
+        rider_id, driver_id = row["rider_id"], row["driver_id"]
 
     # Check authorization - rider or the reviewed driver can view
-    if current_user.id != ride.rider_id and current_user.id != ride.driver_id:
+    if current_user.id != rider_id and current_user.id != driver_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only view reviews for your rides",
         )
 
-    review = db.query(Review).filter(Review.ride_id == ride_id).first()
-    return review
\ No newline at end of file
+    if archive_month:
+        return await find_archived_review(db, archive_month, ride_id)
+    return await _get_review(db, ride_id)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, root_validator
 
@@ -67,12 +67,44 @@ class RideRequestCreate(BaseModel):
     pickup_location: str = Field(min_length=1, max_length=255)
     destination: str = Field(min_length=1, max_length=255)
     ride_date: datetime
+    # Optional exact pickup point; otherwise resolved from known campus landmarks
+    pickup_lat: Optional[float] = Field(None, ge=-90, le=90)
+    pickup_lng: Optional[float] = Field(None, ge=-180, le=180)
+
+    @root_validator
+    def validate_pickup_point(cls, values):
+        if (values.get("pickup_lat") is None) != (values.get("pickup_lng") is None):
+            raise ValueError("pickup_lat and pickup_lng must be given together")
+        return values
 
 
 class RideRequestAction(BaseModel):
     action: str = Field(regex="^(accept|decline)$")
 
 
+class BulkRideCreateItem(RideRequestCreate):
+    rider_email: EmailStr
+
+
+class BulkRideCreate(BaseModel):
+    rides: List[BulkRideCreateItem] = Field(min_items=1)
+
+
+class BulkRespondItem(RideRequestAction):
+    ride_id: int
+    driver_id: Optional[int] = None  # Required to accept
+
+    @root_validator
+    def validate_driver(cls, values):
+        if values.get("action") == "accept" and values.get("driver_id") is None:
+            raise ValueError("driver_id is required to accept a ride")
+        return values
+
+
+class BulkRespond(BaseModel):
+    items: List[BulkRespondItem] = Field(min_items=1)
+
+
 class RiderInfo(BaseModel):
     id: int
     full_name: str
@@ -82,11 +114,20 @@ class RiderInfo(BaseModel):
         orm_mode = True
 
 
+class DriverRatingSummary(BaseModel):
+    rating_count: int
+    rating_average: Optional[float] = None
+
+    class Config:
+        orm_mode = True
+
+
 class DriverInfo(BaseModel):
     id: int
     full_name: str
     email: EmailStr
     license_plate: Optional[str] = None
+    driver_stats: Optional[DriverRatingSummary] = None  # Null until the driver's first review
 
     class Config:
         orm_mode = True
@@ -99,6 +140,9 @@ class RideRequestOut(BaseModel):
     ride_date: datetime
     status: RideStatus
     created_at: datetime
+    pickup_lat: Optional[float] = None
+    pickup_lng: Optional[float] = None
+    distance_m: Optional[float] = None  # Only set for /rides/pending?near= queries
     rider: RiderInfo
     driver: Optional[DriverInfo] = None
 
@@ -108,6 +152,43 @@ class RideRequestOut(BaseModel):
 
 class RideRequestListResponse(BaseModel):
     rides: List[RideRequestOut]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+
+
+class BulkItemResult(BaseModel):
+    index: int  # Position of the item in the request
+    ok: bool
+    ride: Optional[RideRequestOut] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# Dispatch schemas
+class AvailabilityUpdate(BaseModel):
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lng: Optional[float] = Field(None, ge=-180, le=180)
+
+    @root_validator
+    def validate_point(cls, values):
+        if (values.get("lat") is None) != (values.get("lng") is None):
+            raise ValueError("lat and lng must be given together")
+        return values
+
+
+class AvailabilityOut(BaseModel):
+    driver_id: int
+    university_key: str
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    available_since: datetime
+
+    class Config:
+        orm_mode = True
 
 
 # Review schemas
@@ -125,4 +206,17 @@ class ReviewOut(BaseModel):
     reviewer: UserOut
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+# Driver profile schemas
+class DriverStatsOut(DriverRatingSummary):
+    rating_histogram: Dict[int, int]
+
+
+class DriverProfileOut(BaseModel):
+    id: int
+    full_name: str
+    university_key: str
+    license_plate: Optional[str] = None
+    driver_stats: DriverStatsOut
@@ -1,39 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, TypeVar
 import hashlib
+import threading
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jose import JWTError
 
+from .auth_cache import token_cache
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(settings.password_hash_workers + settings.password_hash_queue_size)
 
+T = TypeVar("T")
 
-def hash_password(password: str) -> str:
+
+# passlib and jose.jwt (with its crypto backends) are imported on first use, keeping them off the cold-start path
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+
+@lru_cache(maxsize=None)
+def _jwt():
+    from jose import jwt
+
+    return jwt
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the password hashing pool and its queue are full."""
+
+
+async def _run_hash_job(func: Callable[..., T], *args) -> T:
+    # Fail fast instead of queueing without bound behind a registration spike
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        future = _hash_executor.submit(func, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+def _prehash(password: str) -> str:
     # Bcrypt has a 72-byte limit, so hash the password first if it's longer
     if len(password.encode('utf-8')) > 72:
         password = hashlib.sha256(password.encode()).hexdigest()
-    return pwd_context.hash(password)
+    return password
+
+
+async def hash_password(password: str) -> str:
+    return await _run_hash_job(_pwd_context().hash, _prehash(password))
+
 
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, also returning a new hash if the stored one uses outdated settings."""
+    return await _run_hash_job(_pwd_context().verify_and_update, _prehash(plain_password), hashed_password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Apply the same pre-hashing for passwords longer than 72 bytes
-    if len(plain_password.encode('utf-8')) > 72:
-        plain_password = hashlib.sha256(plain_password.encode()).hexdigest()
-    return pwd_context.verify(plain_password, hashed_password)
+
+STREAM_SCOPE = "events"
 
 
 def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> str:
     expire_minutes = expires_minutes or settings.access_token_expire_minutes
     expire = datetime.utcnow() + timedelta(minutes=expire_minutes)
     to_encode = {"sub": subject, "exp": expire}
-    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return _jwt().encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
-def decode_token(token: str) -> Optional[str]:
-    try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        return payload.get("sub")
-    except JWTError:
-        return None
\ No newline at end of file
+def create_stream_token(subject: str) -> str:
+    """Short-lived token that can only open an event stream, safe to put in a URL."""
+    expire = datetime.utcnow() + timedelta(seconds=settings.stream_token_expire_seconds)
+    to_encode = {"sub": subject, "exp": expire, "scope": STREAM_SCOPE}
+    return _jwt().encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+
+def decode_token(token: str, scope: Optional[str] = None) -> Optional[str]:
+    """Return the token's subject if it is valid and carries exactly ``scope`` (None for normal access tokens)."""
+    # Verified claims are cached until the token expires, skipping the signature check on repeat requests
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = _jwt().decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        except JWTError:
+            return None
+        token_cache.set(token, payload, expires_at=payload.get("exp"))
+    if payload.get("scope") != scope:
+        return None
+    return payload.get("sub")
\ No newline at end of file
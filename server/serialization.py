@@ -0,0 +1,75 @@
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+from .models import RideRequest, User
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain dicts/lists to JSON bytes, formatting datetimes like pydantic does."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for content that is already shaped like its response model.
+
+    Skips FastAPI's response-model validation and ``jsonable_encoder`` pass,
+    so callers are responsible for producing exactly the documented fields.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _rider_to_dict(user: User) -> Dict[str, Any]:
+    # Field order follows schemas.RiderInfo
+    return {"id": user.id, "full_name": user.full_name, "email": user.email}
+
+
+def _driver_to_dict(user: User) -> Dict[str, Any]:
+    # Field order follows schemas.DriverInfo and schemas.DriverRatingSummary
+    stats = user.driver_stats
+    return {
+        "id": user.id,
+        "full_name": user.full_name,
+        "email": user.email,
+        "license_plate": user.license_plate,
+        "driver_stats": (
+            {"rating_count": stats.rating_count, "rating_average": stats.rating_average} if stats else None
+        ),
+    }
+
+
+def ride_to_dict(ride: RideRequest, distance_m: Optional[float] = None) -> Dict[str, Any]:
+    """Shape a ride loaded by ``rides_with_people`` like ``schemas.RideRequestOut``."""
+    return {
+        "id": ride.id,
+        "pickup_location": ride.pickup_location,
+        "destination": ride.destination,
+        "ride_date": ride.ride_date,
+        "status": ride.status.value,
+        "created_at": ride.created_at,
+        "pickup_lat": ride.pickup_lat,
+        "pickup_lng": ride.pickup_lng,
+        "distance_m": distance_m,
+        "rider": _rider_to_dict(ride.rider),
+        "driver": _driver_to_dict(ride.driver) if ride.driver else None,
+    }
@@ -0,0 +1,50 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Wall-clock breakdown of one cold start: imports, schema bootstrap, lifespan and the first request.
+
+    Phases are recorded once per process and served at ``/stats/startup``;
+    the full report is logged when the first request completes.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+
+    def record_imports(self, started: float) -> None:
+        """Record the app's import time, measured from ``started``, which also anchors ``ready``."""
+        self.started = started
+        self.record("import", time.perf_counter() - started)
+
+    def mark_ready(self) -> None:
+        self.record("ready", time.perf_counter() - self.started)
+
+    def record_first_request(self, seconds: float) -> None:
+        if "first_request" in self.phases:
+            return
+        self.record("first_request", seconds)
+        logger.info("Startup timings: %s", self.report())
+
+    def report(self) -> Dict[str, float]:
+        """Phase durations in milliseconds; ``ready`` is measured from the first import of the app."""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()}
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from .config import settings
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets held as ``key -> (tokens, updated_at)`` tuples.
+
+    Each key may spend ``burst`` attempts at once and regains ``per_minute``
+    of them every minute. Buckets that have refilled completely carry no
+    state worth keeping, so they are swept out every ``sweep_seconds``; if
+    ``max_keys`` is still exceeded the least recently used keys are dropped.
+    """
+
+    def __init__(
+        self,
+        burst: int,
+        per_minute: float,
+        max_keys: int = settings.auth_throttle_max_keys,
+        sweep_seconds: float = settings.auth_throttle_sweep_seconds,
+    ):
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.max_keys = max_keys
+        self.sweep_seconds = sweep_seconds
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._next_sweep = time.monotonic() + sweep_seconds
+
+    def acquire(self, key: str) -> float:
+        """Take one token for ``key``; returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep or len(self._buckets) > self.max_keys:
+                self._sweep(now)
+
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                self.allowed += 1
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            self.rejected += 1
+            return (1 - tokens) / self.rate if self.rate > 0 else float(self.sweep_seconds)
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self.sweep_seconds
+        refill_seconds = self.burst / self.rate if self.rate > 0 else float("inf")
+        idle = [key for key, (_, updated_at) in self._buckets.items() if now - updated_at >= refill_seconds]
+        for key in idle:
+            del self._buckets[key]
+        if len(self._buckets) > self.max_keys:
+            # acquire() re-inserts keys, so the front of the dict holds the least recently used ones.
+            # Trim to 90% so a full table is not swept again on the very next call.
+            overflow = len(self._buckets) - self.max_keys * 9 // 10
+            for key in list(self._buckets)[:overflow]:
+                del self._buckets[key]
+            self.evictions += overflow
+        self.evictions += len(idle)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+        }
+
+
+ip_limiter = TokenBucketLimiter(settings.auth_ip_burst, settings.auth_ip_per_minute)
+email_limiter = TokenBucketLimiter(settings.auth_email_burst, settings.auth_email_per_minute)
+
+
+def client_ip(request: Request) -> str:
+    """The peer address; behind a reverse proxy, uvicorn's ``--proxy-headers`` must resolve it from X-Forwarded-For.
+
+    Headers are deliberately not read here: only the server knows which
+    peers are trusted proxies, and trusting any client's X-Forwarded-For
+    would let it pick its own throttle key.
+    """
+    return request.client.host if request.client else "unknown"
+
+
+def throttle_auth_attempt(request: Request, email: Optional[str]) -> None:
+    """Reject an auth attempt with 429 once its client IP or email runs out of tokens.
+
+    Runs before any database query or password hash, so throttled requests
+    cost next to nothing.
+    """
+    if not settings.auth_throttle_enabled:
+        return
+    retry_after = ip_limiter.acquire(client_ip(request))
+    if not retry_after and email:
+        retry_after = email_limiter.acquire(email.lower())
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def throttle_stats() -> Dict[str, Dict[str, int]]:
+    return {"ip": ip_limiter.stats(), "email": email_limiter.stats()}
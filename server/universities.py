@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from . import schemas
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class University(NamedTuple):
+    key: str
+    name: str
+    domains: List[str]
+
+
+class _Snapshot(NamedTuple):
+    by_key: Dict[str, University]
+    by_domain: Dict[str, str]
+    payload: bytes  # Prebuilt /auth/universities body
+    etag: str
+    mtime_ns: int
+
+
+def _build_snapshot(raw: Dict[str, Dict], mtime_ns: int) -> _Snapshot:
+    by_key: Dict[str, University] = {}
+    by_domain: Dict[str, str] = {}
+    for key, info in raw.items():
+        domains = [domain.lower().strip(".") for domain in info.get("domains", [])]
+        by_key[key] = University(key=key, name=info["name"], domains=domains)
+        for domain in domains:
+            if domain in by_domain and by_domain[domain] != key:
+                raise ValueError(f"Domain {domain} is listed for both {by_domain[domain]} and {key}")
+            by_domain[domain] = key
+
+    payload = schemas.UniversitiesResponse(
+        universities=[
+            schemas.University(key=university.key, name=university.name, domains=university.domains)
+            for university in by_key.values()
+        ]
+    ).json().encode()
+    etag = f'"{hashlib.blake2s(payload, digest_size=8).hexdigest()}"'
+    return _Snapshot(by_key, by_domain, payload, etag, mtime_ns)
+
+
+class UniversityRegistry:
+    """Universities and their email domains, loaded from a JSON data file.
+
+    Lookups go through a precomputed domain -> university index, and the
+    ``/auth/universities`` body is rendered once per load. The file's
+    modification time is checked at most every ``reload_seconds``; a changed
+    file is reloaded in place, and a file that fails to load leaves the
+    previous registry in service.
+    """
+
+    def __init__(self, path: Path, reload_seconds: float = settings.universities_reload_seconds):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + reload_seconds
+        self._snapshot = self._load()
+
+    def _load(self) -> _Snapshot:
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        with open(self.path, encoding="utf-8") as f:
+            return _build_snapshot(json.load(f), mtime_ns)
+
+    def _current(self) -> _Snapshot:
+        if self.reload_seconds > 0 and time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        return self._snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Reload the data file if it changed since the last load; returns whether it did."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_seconds
+            try:
+                if os.stat(self.path).st_mtime_ns == self._snapshot.mtime_ns:
+                    return False
+                self._snapshot = self._load()
+            except (OSError, ValueError, KeyError):
+                logger.exception("Could not reload universities from %s; keeping the previous list", self.path)
+                return False
+        logger.info("Reloaded %d universities from %s", len(self._snapshot.by_key), self.path)
+        return True
+
+    def get(self, key: str) -> Optional[University]:
+        return self._current().by_key.get(key)
+
+    def keys(self) -> List[str]:
+        return list(self._current().by_key)
+
+    def match_domain(self, domain: str) -> Optional[str]:
+        """Return the university key for an email domain, matching subdomains of listed domains."""
+        by_domain = self._current().by_domain
+        domain = domain.lower().strip(".")
+        while domain:
+            key = by_domain.get(domain)
+            if key is not None:
+                return key
+            _, _, domain = domain.partition(".")
+        return None
+
+    def payload(self):
+        """Return the prebuilt ``/auth/universities`` body and its ETag."""
+        snapshot = self._current()
+        return snapshot.payload, snapshot.etag
+
+
+registry = UniversityRegistry(settings.universities_path)
@@ -0,0 +1,55 @@
+import hashlib
+import secrets
+import threading
+from typing import Dict, Hashable, Optional, Union
+
+
+class VersionCounter:
+    """Monotonically increasing per-key versions used to build ETags.
+
+    Versions live in process memory; the random epoch makes sure a tag handed
+    out before a restart can never match one handed out after it.
+    """
+
+    def __init__(self):
+        self.epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._versions: Dict[Hashable, int] = {}
+
+    def get(self, key: Hashable) -> int:
+        return self._versions.get(key, 0)
+
+    def bump(self, key: Hashable) -> int:
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            return version
+
+
+ride_versions = VersionCounter()
+
+
+def pending_scope(university_key: str) -> str:
+    return f"pending:{university_key}"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def ratings_scope(university_key: str) -> str:
+    return f"ratings:{university_key}"
+
+
+def make_etag(scope: str, version: Union[int, str], variant: str = "") -> str:
+    """Build an ETag; ``variant`` distinguishes different views (e.g. pages) of one scope."""
+    if variant:
+        scope = f"{scope}-{hashlib.blake2s(variant.encode(), digest_size=6).hexdigest()}"
+    return f'W/"{ride_versions.epoch}-{scope}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
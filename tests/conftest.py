@@ -0,0 +1,9 @@
+import os
+
+from benchmarks.common import use_temp_database
+
+# Settings are read when ``server`` is first imported, so this has to run before any test module loads
+use_temp_database()
+os.environ.setdefault("APP_SERVER_TIMING_HEADER", "true")
+os.environ.setdefault("APP_AUTH_THROTTLE_ENABLED", "false")
+os.environ.setdefault("APP_BCRYPT_ROUNDS", "4")
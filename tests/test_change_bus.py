@@ -0,0 +1,9 @@
+from benchmarks.change_bus import run
+from benchmarks.common import summarize
+
+
+def test_every_worker_receives_every_other_workers_messages_quickly():
+    latencies, expected = run(workers=3, messages=50, rate=200, poll=0.05)
+    assert len(latencies) == expected
+    # Bounded by the poll interval plus a write; generous so loaded CI machines don't flake
+    assert summarize(latencies)["p99_ms"] < 500
@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.serialization import build_rides, render_both
+
+
+@pytest.mark.parametrize("count", [1, 500])
+def test_fast_path_matches_response_model(count):
+    default, fast = render_both(build_rides(count))
+    assert fast == default
@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+
+from benchmarks import statement_counts
+
+
+@pytest.fixture(scope="module")
+def counts():
+    return asyncio.run(statement_counts.measure())
+
+
+@pytest.mark.parametrize("label", statement_counts.BUDGETS)
+def test_endpoint_stays_within_statement_budget(counts, label):
+    endpoint_counts, _, _ = counts
+    assert endpoint_counts[label] <= statement_counts.BUDGETS[label]
+
+
+@pytest.mark.parametrize("label", statement_counts.CONSTANT)
+def test_list_statement_count_does_not_grow_with_rides(counts, label):
+    _, one, many = counts
+    assert many[label] == one[label]